@@ -0,0 +1,18 @@
+"""
+Benchmarks of the extractors and translation methods, on a synthetic corpus.
+
+Run all benchmarks, and save the results:
+
+.. code-block:: bash
+
+    python -m benchmarks --output baseline.json
+
+Compare the results to a saved baseline, exiting with an error if any benchmark is slower by more than the threshold:
+
+.. code-block:: bash
+
+    python -m benchmarks --compare baseline.json --threshold 0.1
+
+The corpus is configurable with the ``--size``, ``--depth``, ``--repetition`` and ``--seed`` options. To keep the
+corpus, set ``--corpus DIRECTORY``. For all options, run ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,102 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import Corpus
+from benchmarks.suite import collect
+
+LANGUAGES = ("es", "fr")
+
+
+def measure(function, repeat):
+    """Call the function once to warm up, then ``repeat`` times, and return the minimum and median durations."""
+    function()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return {"min": min(durations), "median": statistics.median(durations)}
+
+
+def compare(baseline, results, threshold):
+    """Print the change in the minimum duration of each benchmark, and return the names of regressed benchmarks."""
+    regressions = []
+    print(f"{'benchmark':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<32} {'':>10} {result['min'] * 1000:>8.2f}ms {'new':>8}")
+            continue
+        before = baseline[name]["min"]
+        change = result["min"] / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = " !"
+        print(f"{name:<32} {before * 1000:>8.2f}ms {result['min'] * 1000:>8.2f}ms {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the benchmarks of the extractors and translation methods."
+    )
+    parser.add_argument("--size", type=int, default=200, help="definitions, rows, sections and items per file")
+    parser.add_argument("--depth", type=int, default=4, help="nesting depth of schema definitions")
+    parser.add_argument("--repetition", type=float, default=0.3, help="probability that a string repeats")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed calls per benchmark")
+    parser.add_argument("--filter", default="", help="run only benchmarks whose names contain this string")
+    parser.add_argument("--corpus", help="write the corpus to this directory, instead of a temporary directory")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="maximum slowdown before failing (0.1 is 10%%)")
+    args = parser.parse_args()
+
+    parameters = {"size": args.size, "depth": args.depth, "repetition": args.repetition, "seed": args.seed}
+    corpus = Corpus(**parameters)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = args.corpus or tmpdir
+        sources = corpus.write(directory, LANGUAGES)
+        benchmarks = collect(sources, f"{directory}/locale", LANGUAGES, f"{tmpdir}/build")
+
+        results = {}
+        for name, function in benchmarks.items():
+            if args.filter in name:
+                results[name] = measure(function, args.repeat)
+                print(
+                    f"{name:<32} {results[name]['min'] * 1000:>8.2f}ms (median {results[name]['median'] * 1000:.2f}ms)"
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "metadata": {
+                        "python": platform.python_version(),
+                        "implementation": platform.python_implementation(),
+                        "corpus": parameters,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["metadata"]["corpus"] != parameters:
+            print("warning: the baseline was measured on a different corpus", file=sys.stderr)
+        print()
+        if compare(baseline["results"], results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
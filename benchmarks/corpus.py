@@ -0,0 +1,220 @@
+"""Generate a synthetic corpus of schemas, codelists, Markdown, YAML and message catalogs."""
+
+import array
+import csv
+import json
+import os
+import random
+import struct
+
+WORDS = (
+    "award", "buyer", "contract", "data", "date", "description", "document", "amount", "identifier", "item",
+    "milestone", "organization", "party", "period", "planning", "procurement", "project", "release", "status",
+    "supplier", "tender", "title", "transaction", "value", "budget", "currency", "classification", "scheme", "unit",
+    "quantity", "address", "contact", "point", "implementation", "payment", "method", "procedure", "framework", "lot",
+    "bid", "evaluation", "criteria", "notice", "publication", "language", "extension", "codelist", "field", "object",
+)  # fmt: skip
+
+CODELIST_HEADERS = ("Code", "Title", "Description")
+YAML_KEYS = ("title", "disclosure format", "mapping")
+
+DOMAINS = {
+    "schema": ("release-schema.json", "extension.json"),
+    "codelists": ("codelist.csv",),
+    "docs": ("guide.md",),
+    "mappings": ("mapping.yaml",),
+}
+
+
+class Corpus:
+    """
+    A deterministic generator of source files and their messages.
+
+    :param size: the number of definitions, codelist rows, Markdown sections and YAML items
+    :param depth: the nesting depth of each schema definition
+    :param repetition: the probability (between 0 and 1) that a string repeats an earlier string
+    :param seed: the seed of the random number generator
+    """
+
+    def __init__(self, size=200, depth=4, repetition=0.3, seed=0):  # noqa: D107
+        self.size = size
+        self.depth = depth
+        self.repetition = repetition
+        self.random = random.Random(seed)
+        self.strings = []
+        # Messages by domain.
+        self.messages = {domain: set() for domain in DOMAINS}
+
+    def text(self, domain, minimum=3, maximum=12):
+        """
+        Return a sentence, which might repeat an earlier sentence.
+
+        If ``domain`` is set, add the sentence to the domain's messages.
+        """
+        if self.strings and self.random.random() < self.repetition:
+            text = self.random.choice(self.strings)
+        else:
+            words = self.random.choices(WORDS, k=self.random.randint(minimum, maximum))
+            text = " ".join(words).capitalize() + "."
+            self.strings.append(text)
+        if domain:
+            self.messages[domain].add(text)
+        return text
+
+    def schema(self):
+        """Return a JSON Schema with ``size`` definitions, each nested ``depth`` levels deep."""
+        return {
+            "id": "https://standard.open-contracting.org/schema/{{version}}/release-schema.json",
+            "title": self.text("schema"),
+            "description": self.text("schema"),
+            "type": "object",
+            "properties": {
+                "definitions": {"type": "array", "items": {"$ref": "#/definitions/Definition0"}},
+            },
+            "definitions": {f"Definition{i}": self._schema_object(self.depth) for i in range(self.size)},
+        }
+
+    def _schema_object(self, depth):
+        properties = {}
+        for i in range(self.random.randint(2, 5)):
+            if depth > 1 and i == 0:
+                properties[f"field{i}"] = self._schema_object(depth - 1)
+            else:
+                properties[f"field{i}"] = {
+                    "title": self.text("schema", 1, 4),
+                    "description": self.text("schema"),
+                    "type": ["string", "null"],
+                    "enum": ["open", "closed", None],
+                }
+        return {
+            "title": self.text("schema", 1, 4),
+            "description": self.text("schema"),
+            "type": "object",
+            "properties": properties,
+        }
+
+    def extension_metadata(self):
+        """Return extension metadata in the current format."""
+        return {
+            "name": {"en": self.text("schema", 1, 4)},
+            "description": {"en": self.text("schema")},
+            "documentationUrl": {"en": "https://example.com/"},
+            "compatibility": ["1.1"],
+        }
+
+    def codelist(self):
+        """Return ``size`` codelist rows."""
+        for header in CODELIST_HEADERS:
+            self.messages["codelists"].add(header)
+        return [
+            {"Code": f"code{i}", "Title": self.text("codelists", 1, 4), "Description": self.text("codelists")}
+            for i in range(self.size)
+        ]
+
+    def markdown(self):
+        """Return a Markdown document with ``size`` sections."""
+        blocks = []
+        for i in range(self.size):
+            blocks.append(f"## {self.text('docs', 1, 4)}")
+            paragraph = f"{self.text(None)} See [the schema](https://example.com/{i}) and *{self.text(None, 1, 3)}*"
+            self.messages["docs"].add(paragraph)
+            blocks.append(paragraph)
+            blocks.append("\n".join(f"- {self.text('docs', 2, 6)}" for _ in range(3)))
+            if i % 5 == 0:
+                blocks.append('```json\n{"id": "%d"}\n```' % i)  # noqa: UP031
+        return "\n\n".join(blocks) + "\n"
+
+    def yaml(self):
+        """Return ``size`` OC4IDS-style mapping items."""
+        items = []
+        for i in range(self.size):
+            mapping = f"{self.text(None)}\n\n{self.text(None)}"
+            self.messages["mappings"].add(mapping)
+            items.append(
+                {
+                    "id": str(i),
+                    "title": self.text("mappings", 1, 4),
+                    "disclosure format": self.text("mappings"),
+                    "mapping": mapping,
+                }
+            )
+        return items
+
+    def write(self, directory, languages=("es",)):
+        """
+        Write the source files and the message catalogs to the directory.
+
+        Source files are written to a subdirectory per domain, and message catalogs to the ``locale`` subdirectory.
+        Each message is translated by prefixing the language code.
+
+        :returns: a dict of domains to lists of source file paths
+        """
+        contents = {
+            "release-schema.json": json.dumps(self.schema(), ensure_ascii=False, indent=2),
+            "extension.json": json.dumps(self.extension_metadata(), ensure_ascii=False, indent=2),
+            "guide.md": self.markdown(),
+        }
+        try:
+            import yaml  # noqa: PLC0415
+        except ImportError:
+            # JSON is valid YAML.
+            contents["mapping.yaml"] = json.dumps(self.yaml(), ensure_ascii=False, indent=2)
+        else:
+            contents["mapping.yaml"] = yaml.safe_dump(self.yaml(), default_flow_style=False, allow_unicode=True)
+
+        sources = {}
+        for domain, basenames in DOMAINS.items():
+            os.makedirs(os.path.join(directory, domain), exist_ok=True)
+            sources[domain] = [os.path.join(directory, domain, basename) for basename in basenames]
+
+        for path in sources["codelists"]:
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=CODELIST_HEADERS, lineterminator="\n")
+                writer.writeheader()
+                writer.writerows(self.codelist())
+
+        for paths in sources.values():
+            for path in paths:
+                basename = os.path.basename(path)
+                if basename in contents:
+                    with open(path, "w") as f:
+                        f.write(contents[basename])
+
+        localedir = os.path.join(directory, "locale")
+        for language in languages:
+            for domain, messages in self.messages.items():
+                _write_mo(localedir, language, domain, {message: f"[{language}] {message}" for message in messages})
+
+        return sources
+
+
+def _write_mo(localedir, language, domain, messages):
+    """Write a GNU MO file, like ``msgfmt`` or ``pybabel compile``."""
+    directory = os.path.join(localedir, language, "LC_MESSAGES")
+    os.makedirs(directory, exist_ok=True)
+
+    messages = {"": "Content-Type: text/plain; charset=UTF-8\n", **messages}
+    keys = sorted(messages)
+
+    offsets = []
+    ids = strs = b""
+    for key in keys:
+        msgid = key.encode()
+        msgstr = messages[key].encode()
+        offsets.append((len(ids), len(msgid), len(strs), len(msgstr)))
+        ids += msgid + b"\0"
+        strs += msgstr + b"\0"
+
+    keystart = 7 * 4 + 16 * len(keys)
+    valuestart = keystart + len(ids)
+    koffsets = []
+    voffsets = []
+    for o1, l1, o2, l2 in offsets:
+        koffsets += [l1, o1 + keystart]
+        voffsets += [l2, o2 + valuestart]
+
+    with open(os.path.join(directory, f"{domain}.mo"), "wb") as f:
+        f.write(struct.pack("Iiiiiii", 0x950412DE, 0, len(keys), 7 * 4, 7 * 4 + len(keys) * 8, 0, 0))
+        f.write(array.array("i", koffsets + voffsets).tobytes())
+        f.write(ids)
+        f.write(strs)
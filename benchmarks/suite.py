@@ -0,0 +1,135 @@
+"""Benchmarks of each extractor and translation method."""
+
+import gettext
+import importlib.util
+import os
+from io import BytesIO, StringIO
+
+from benchmarks.corpus import YAML_KEYS
+from ocds_babel.extract import (
+    extract_codelist,
+    extract_extension_metadata,
+    extract_schema,
+    extract_unique,
+    extract_yaml,
+)
+from ocds_babel.translate import (
+    compile_schema_plan,
+    translate,
+    translate_codelist,
+    translate_extension_metadata,
+    translate_languages,
+    translate_schema,
+    translate_schema_plan,
+    translate_schema_stream,
+)
+from ocds_babel.util import json_loads
+
+HEADERS = ("Title", "Description")
+
+MARKDOWN = importlib.util.find_spec("markdown_it") is not None and importlib.util.find_spec("mdformat") is not None
+YAML = importlib.util.find_spec("yaml") is not None
+
+
+def collect(sources, localedir, languages, outdir):
+    """
+    Return a dict of benchmark names to functions without arguments.
+
+    :param sources: a dict of domains to lists of source file paths, as returned by :meth:`Corpus.write`
+    :param localedir: the directory containing the message catalogs
+    :param languages: the languages of the message catalogs
+    :param outdir: a directory in which to write translated files
+    """
+    language = languages[0]
+    schema, extension = (_read(path) for path in sources["schema"])
+    codelist = _read(sources["codelists"][0])
+    markdown = _read(sources["docs"][0])
+    mapping = _read(sources["mappings"][0])
+
+    translators = {domain: gettext.translation(domain, localedir, languages=[language]) for domain in sources}
+
+    schema_data = json_loads(schema)
+    plan = compile_schema_plan(schema_data)
+
+    # Markdown and YAML are optional.
+    configuration = [
+        (paths, os.path.join(outdir, language, domain), domain)
+        for domain, paths in sources.items()
+        if (domain != "docs" or MARKDOWN) and (domain != "mappings" or YAML)
+    ]
+
+    benchmarks = {
+        "extract_codelist": lambda: list(
+            extract_codelist(_named("codelist.csv", codelist), [], [], {"headers": ",".join(HEADERS)})
+        ),
+        "extract_schema": lambda: list(extract_schema(_named("release-schema.json", schema), [], [], {})),
+        "extract_schema (stream)": lambda: list(
+            extract_schema(_named("release-schema.json", schema), [], [], {"stream": "true"})
+        ),
+        "extract_unique": lambda: extract_unique(sources["schema"][:1], extract_schema),
+        "extract_extension_metadata": lambda: list(
+            extract_extension_metadata(_named("extension.json", extension), [], [], {})
+        ),
+        "translate_codelist": lambda: translate_codelist(
+            StringIO(codelist.decode()), translators["codelists"], HEADERS
+        ),
+        "translate_schema": lambda: translate_schema(
+            StringIO(schema.decode()), translators["schema"], lang=language, version="1.1"
+        ),
+        "translate_schema_stream": lambda: translate_schema_stream(
+            StringIO(schema.decode()), StringIO(), translators["schema"], lang=language, version="1.1"
+        ),
+        "translate_schema_plan": lambda: translate_schema_plan(
+            schema_data, plan, translators["schema"], lang=language, version="1.1"
+        ),
+        "translate_extension_metadata": lambda: translate_extension_metadata(
+            StringIO(extension.decode()), translators["schema"], lang=language
+        ),
+        "translate": lambda: translate(configuration, localedir, language, HEADERS, keys=YAML_KEYS, version="1.1"),
+        "translate_languages": lambda: translate_languages(
+            [
+                (paths, lambda language, target=target: os.path.join(target, language), domain)
+                for paths, target, domain in configuration
+            ],
+            localedir,
+            languages,
+            HEADERS,
+            keys=YAML_KEYS,
+            version="1.1",
+        ),
+    }
+
+    if YAML:
+        from ocds_babel.translate_yaml import translate_yaml  # noqa: PLC0415
+
+        benchmarks["extract_yaml"] = lambda: list(
+            extract_yaml(_named("mapping.yaml", mapping), [], [], {"keys": ",".join(YAML_KEYS)})
+        )
+        benchmarks["translate_yaml"] = lambda: translate_yaml(
+            StringIO(mapping.decode()), translators["mappings"], keys=YAML_KEYS
+        )
+
+    if MARKDOWN:
+        from ocds_babel import translate_markdown  # noqa: PLC0415
+
+        def translate_markdown_data():
+            # Clear the caches, to measure translating a document for the first time.
+            translate_markdown._block_cache.clear()  # noqa: SLF001
+            translate_markdown._parse_inline.cache_clear()  # noqa: SLF001
+            return translate_markdown.translate_markdown_data("guide.md", markdown.decode(), translators["docs"])
+
+        benchmarks["translate_markdown_data"] = translate_markdown_data
+
+    return benchmarks
+
+
+# Babel passes named file objects to extractors.
+def _named(name, data):
+    fileobj = BytesIO(data)
+    fileobj.name = name
+    return fileobj
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,168 @@
+"""
+Extract messages from a project into a POT file, like ``pybabel extract``, but in parallel.
+
+Files are found and matched to extractors in the same way as ``pybabel extract -F``. Each file's messages are
+extracted by a pool of processes, and are merged in the same order as ``pybabel extract``, so that the POT file is
+identical, other than its creation date.
+
+.. code-block:: bash
+
+    ocds-babel-extract -F babel_ocds_schema.cfg -o build/locale/schema.pot --jobs 4 schema
+
+Or, in Python:
+
+.. code:: python
+
+    from ocds_babel.extract_project import extract_project
+
+    extract_project('babel_ocds_schema.cfg', ['schema'], 'build/locale/schema.pot', jobs=4)
+
+This requires Babel:
+
+.. code-block:: bash
+
+    pip install babel
+"""
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from babel.messages.catalog import Catalog
+from babel.messages.extract import DEFAULT_KEYWORDS, check_and_call_extract_file
+from babel.messages.frontend import parse_mapping_cfg
+from babel.messages.pofile import write_po
+from babel.util import pathmatch
+
+logger = logging.getLogger("ocds_babel")
+
+
+def extract_project(mapping_file, input_paths, output_file, jobs=None, width=76, **kwargs):
+    """
+    Extract messages from the input paths, using the mapping configuration file, and write a POT file.
+
+    If ``jobs`` is greater than 1, extract messages in parallel, using a pool of that many processes.
+
+    Keyword arguments are passed to :func:`extract_catalog`.
+    """
+    with open(mapping_file) as f:
+        method_map, options_map = parse_mapping_cfg(f, filename=mapping_file)
+
+    catalog = extract_catalog([(path, method_map, options_map) for path in input_paths], jobs=jobs, **kwargs)
+
+    with open(output_file, "wb") as f:
+        write_po(f, catalog, width=width)
+
+    return catalog
+
+
+def extract_catalog(
+    mappings,
+    jobs=None,
+    keywords=DEFAULT_KEYWORDS,
+    comment_tags=(),
+    strip_comment_tags=False,  # noqa: FBT002
+    **kwargs,
+):
+    """
+    Extract messages from the input paths, and return a Babel catalog.
+
+    ``mappings`` is a list of ``(path, method_map, options_map)`` tuples, where ``path`` is a file or directory, and
+    ``method_map`` and ``options_map`` are as returned by Babel's ``parse_mapping_cfg``.
+
+    If ``jobs`` is greater than 1, extract messages in parallel, using a pool of that many processes.
+
+    Keyword arguments (like ``project`` and ``version``) are passed to Babel's ``Catalog``.
+    """
+    tasks = []
+    paths = []
+    for path, method_map, options_map in mappings:
+        for filepath, dirpath in _find_files(path, method_map):
+            tasks.append(
+                (filepath, method_map, options_map, None, keywords, comment_tags, strip_comment_tags, dirpath)
+            )
+            paths.append(path)
+
+    catalog = Catalog(**kwargs)
+
+    if jobs and jobs > 1:
+        with ProcessPoolExecutor(jobs) as executor:
+            # Results are returned in the same order as the tasks.
+            results = executor.map(_extract_file, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+            _add_messages(catalog, paths, results)
+    else:
+        _add_messages(catalog, paths, map(_extract_file, tasks))
+
+    return catalog
+
+
+# This should match the logic of `babel.messages.frontend.ExtractMessages.run`.
+def _add_messages(catalog, paths, results):
+    for path, extracted in zip(paths, results, strict=True):
+        isfile = os.path.isfile(path)
+        for filename, lineno, message, comments, context in extracted:
+            filepath = filename if isfile else os.path.normpath(os.path.join(path, filename))
+            catalog.add(message, None, [(filepath, lineno)], auto_comments=comments, context=context)
+
+
+def _extract_file(task):
+    logger.info("Extracting messages from %s", task[0])
+    return list(check_and_call_extract_file(*task))
+
+
+# This should match the logic of `babel.messages.extract.extract_from_dir`, with the default directory filter.
+def _find_files(path, method_map):
+    if os.path.isfile(path):
+        yield path, os.getcwd()
+        return
+
+    dirname = os.path.abspath(path)
+    for root, dirnames, filenames in os.walk(dirname):
+        dirnames[:] = sorted(
+            subdir for subdir in dirnames if _include_directory(os.path.join(root, subdir), dirname, method_map)
+        )
+        for filename in sorted(filenames):
+            filepath = os.path.join(root, filename).replace(os.sep, "/")
+            relative = os.path.relpath(filepath, dirname)
+            # Skip files that no extractor would read, instead of sending them to a process.
+            if any(pathmatch(pattern, relative) and method != "ignore" for pattern, method in method_map):
+                yield filepath, dirname
+
+
+def _include_directory(dirpath, dirname, method_map):
+    subdir = os.path.basename(dirpath)
+    if subdir.startswith((".", "_")):
+        return False
+    relative = os.path.relpath(dirpath, dirname).replace(os.sep, "/")
+    return not any(method == "ignore" and pathmatch(pattern, relative) for pattern, method in method_map)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract messages from a project into a POT file, in parallel.")
+    parser.add_argument("input_paths", nargs="+", metavar="PATH", help="files or directories to extract from")
+    parser.add_argument("-F", "--mapping-file", required=True, help="path to the mapping configuration file")
+    parser.add_argument("-o", "--output-file", required=True, help="path to the output POT file")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="number of processes to use")
+    parser.add_argument("-w", "--width", type=int, default=76, help="maximum line width (default 76)")
+    parser.add_argument("--no-wrap", action="store_true", help="do not break long message lines")
+    parser.add_argument("--project", help="project name")
+    parser.add_argument("--version", help="project version")
+    parser.add_argument("--copyright-holder", help="copyright holder")
+    parser.add_argument("--msgid-bugs-address", help="email address for message bug reports")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not log each file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format="%(message)s")
+
+    extract_project(
+        args.mapping_file,
+        args.input_paths,
+        args.output_file,
+        jobs=args.jobs,
+        width=None if args.no_wrap else args.width,
+        project=args.project,
+        version=args.version,
+        copyright_holder=args.copyright_holder,
+        msgid_bugs_address=args.msgid_bugs_address,
+    )
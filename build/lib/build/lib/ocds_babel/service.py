@@ -0,0 +1,180 @@
+"""
+A long-lived translation service, for example, for an endpoint that translates documents on demand.
+
+.. code:: python
+
+    from ocds_babel.service import TranslationService
+
+    service = TranslationService(localedir)
+
+    data = service.translate_schema_data(schema, 'schema', 'es', version='1.1')
+
+Message catalogs are loaded once per domain and language, on first use, and are reloaded if their MO files change.
+Messages are looked up once per domain, language and keyword arguments, using a
+:class:`~ocds_babel.translations.TranslationMemo`.
+
+Translated documents are cached by the hash of their source, the domain, the language and the keyword arguments. If
+the cache exceeds ``cache_size`` documents, the least recently used document is evicted. Cached documents are returned
+as-is, so they must not be modified.
+
+The service can be used by many threads.
+"""
+
+import errno
+import gettext
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from ocds_babel.translate import (
+    translate_codelist_data,
+    translate_extension_metadata_data,
+    translate_schema_data,
+)
+from ocds_babel.translations import TranslationMemo
+from ocds_babel.util import json_dumps
+
+
+class TranslationService:
+    """
+    Translate documents using the message catalogs in a locale directory, and cache the translated documents.
+
+    :param localedir: the path of the directory containing message catalog files
+    :param cache_size: the maximum number of translated documents to cache
+    :param class_: the class of message catalogs, e.g. :class:`~ocds_babel.translations.MappedTranslations`
+    """
+
+    def __init__(self, localedir, cache_size=128, class_=None):  # noqa: D107
+        self.localedir = localedir
+        self.cache_size = cache_size
+        self.class_ = class_
+        #: The number of documents served from the cache, and of documents translated
+        self.hits = 0
+        self.misses = 0
+        self.memo = TranslationMemo()
+        # (domain, language) => (path, stat, translator)
+        self._catalogs = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def translator(self, domain, language):
+        """
+        Return the message catalog for the domain and language, loading it if it isn't loaded or its MO file changed.
+
+        As in :func:`~ocds_babel.translate.translate`, a missing English catalog is replaced by an empty catalog.
+        """
+        return self._catalog(domain, language)[2]
+
+    def translate_schema_data(self, source, domain, language, **kwargs):
+        """Like :func:`~ocds_babel.translate.translate_schema_data`, replacing `{{lang}}` with the language code."""
+        return self._translate(
+            ("schema",), source, domain, language, dict(lang=language, **kwargs), translate_schema_data
+        )
+
+    def translate_codelist_data(self, source, domain, language, headers=()):
+        """Like :func:`~ocds_babel.translate.translate_codelist_data`, for CSV rows as a list of dictionaries."""
+        headers = tuple(headers)
+        return self._translate(
+            ("codelist", headers), source, domain, language, {}, translate_codelist_data, headers=headers
+        )
+
+    def translate_extension_metadata_data(self, source, domain, language):
+        """Like :func:`~ocds_babel.translate.translate_extension_metadata_data`."""
+        return self._translate(
+            ("extension_metadata",), source, domain, language, {}, translate_extension_metadata_data, lang=language
+        )
+
+    def translate_markdown_data(self, name, md, domain, language):
+        """Like :func:`~ocds_babel.translate_markdown.translate_markdown_data`."""
+        from ocds_babel.translate_markdown import translate_markdown_data  # noqa: PLC0415
+
+        def method(source, translator):
+            return translate_markdown_data(name, source, translator)
+
+        return self._translate(("markdown",), md, domain, language, {}, method)
+
+    def translate_yaml_data(self, source, domain, language, keys=(), **kwargs):
+        """Like :func:`~ocds_babel.translate_yaml.translate_yaml_data`."""
+        from ocds_babel.translate_yaml import translate_yaml_data  # noqa: PLC0415
+
+        keys = tuple(keys)
+        return self._translate(("yaml", keys), source, domain, language, kwargs, translate_yaml_data, keys=keys)
+
+    def clear(self):
+        """Clear the cache of translated documents and the translation memo, and unload all message catalogs."""
+        with self._lock:
+            self._cache.clear()
+            self._catalogs.clear()
+            self.memo = TranslationMemo()
+
+    def _catalog(self, domain, language):
+        with self._lock:
+            catalog = self._catalogs.get((domain, language))
+            if catalog is not None:
+                path, stat, _ = catalog
+                if path is None or _stat(path) == stat:
+                    return catalog
+
+            path = gettext.find(domain, self.localedir, languages=[language])
+            if path is None:
+                if language != "en":
+                    raise FileNotFoundError(errno.ENOENT, "No translation file found for domain", domain)
+                stat = None
+                translator = gettext.NullTranslations()
+            else:
+                # Unlike `gettext.translation`, don't re-use a catalog that was loaded from the same path.
+                stat = _stat(path)
+                with open(path, "rb") as f:
+                    translator = (self.class_ or gettext.GNUTranslations)(f)
+            # Discard the messages looked up in the previous catalog.
+            for key in [key for key in self.memo.cache if key[:2] == (domain, language)]:
+                del self.memo.cache[key]
+            self.memo.untranslated_messages.pop((domain, language), None)
+
+            catalog = self._catalogs[(domain, language)] = (path, stat, translator)
+            return catalog
+
+    # `method` is called with the source, a translator that replaces markers with `substitutions`, and `options`.
+    def _translate(self, key, source, domain, language, substitutions, method, **options):
+        _, stat, translator = self._catalog(domain, language)
+
+        # The catalog's status is part of the key, so that documents translated by a previous catalog aren't served.
+        key = (*key, _digest(source), domain, language, stat, *sorted(substitutions.items()))
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            bound = self.memo.bind(translator, domain, language, **substitutions)
+
+        result = method(source, bound, **options)
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+
+def _digest(source):
+    if isinstance(source, str):
+        data = source
+    else:
+        try:
+            data = json_dumps(source)
+        # YAML data can contain dates, for example.
+        except TypeError:
+            data = repr(source)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
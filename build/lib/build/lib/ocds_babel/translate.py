@@ -0,0 +1,647 @@
+"""
+In the Sphinx build configuration file (``conf.py``), ``translate`` codelist CSV files and JSON Schema files.
+
+.. code:: python
+
+    import os
+    from glob import glob
+    from pathlib import Path
+
+    from ocds_babel.translate import translate
+
+
+    def setup(app):
+        basedir = Path(__file__).resolve().parents[1]
+        localedir = basedir / 'locale'
+        language = app.config.overrides.get('language', 'en')
+        headers = ['Title', 'Description', 'Extension']
+
+        translate([
+            (glob(str(basedir / 'schema' / '*-schema.json')), basedir / 'build' / language, 'schema'),
+            (glob(str(basedir / 'schema' / 'codelists')), basedir / 'build' / language, 'codelists'),
+        ], localedir, language, headers)
+
+:code:`translate` automatically determines the translation method to used based on filenames.
+The arguments to :code:`translate` are:
+
+#. A list of tuples. Each tuple has three values:
+
+   #. Input files (a list of paths of files to translate)
+   #. Output directory (the path of the directory in which to write translated files)
+   #. Gettext domain (the filename without extension of the message catalog to use)
+
+#. Locale directory (the path of the directory containing message catalog files)
+#. Target language (the code of the language to translate to)
+#. Optional keyword arguments to replace ``{{marker}}`` markers with values, e.g. :code:`version='1.1'`
+
+To translate files in parallel, set the ``jobs`` argument to the number of processes to use, e.g. :code:`jobs=4`.
+Each process loads each message catalog once. Files are written and messages are logged in the same order as without
+``jobs``.
+
+``translate`` returns a :class:`TranslationStats` object, with the time taken to load each message catalog and, for
+each file, a :class:`FileStats` object, with the time taken, the bytes read and written, and the number of messages
+looked up and left untranslated. To report progress, set the ``progress`` argument to a function, which is called
+with each :class:`FileStats` object, in order, as each file is translated or skipped.
+
+Each output file is replaced atomically, and only if its content changed, so that the modification times of unchanged
+files are preserved for downstream tools (like Sphinx or rsync). :attr:`FileStats.written` is ``False`` for unchanged
+files.
+
+To skip files whose source, message catalog and arguments are unchanged since the previous call, set
+:code:`incremental=True`. A manifest is kept in each output directory, and each skipped file is logged.
+
+To translate files into multiple languages, use :code:`translate_languages`, which reads and parses each file once,
+instead of once per language.
+
+Methods are also available for translating ``extension.json``, Markdown files and YAML files.
+
+To translate the same JSON Schema many times (e.g. into many languages, or on demand), compile it once with
+:code:`compile_schema_plan`, and translate it with :code:`translate_schema_plan`. The plan can be stored as JSON.
+
+Install requirements for Markdown translation
+---------------------------------------------
+
+To translate Markdown files, you must install:
+
+.. code-block:: bash
+
+    pip install ocds-babel[markdown]
+
+Install requirements for YAML translation
+-----------------------------------------
+
+To translate YAML files, you must install:
+
+.. code-block:: bash
+
+    pip install ocds-babel[yaml]
+
+Install requirements for faster JSON
+------------------------------------
+
+To parse and serialize JSON files faster, with identical output, you can install:
+
+.. code-block:: bash
+
+    pip install ocds-babel[orjson]
+"""
+
+import contextlib
+import csv
+import filecmp
+import gettext
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass, field
+from io import StringIO
+
+from ocds_babel import TRANSLATABLE_EXTENSION_METADATA_KEYWORDS, TRANSLATABLE_SCHEMA_KEYWORDS
+from ocds_babel.translations import TranslationMemo
+from ocds_babel.util import (
+    copy_paths,
+    json_dump,
+    json_dumps,
+    json_loads,
+    locations_from_paths,
+    text_to_translate,
+    translatable_locations,
+    translatable_paths,
+    translate_locations,
+)
+
+with contextlib.suppress(ImportError):
+    from ocds_babel.translate_markdown import _prepare_markdown, translate_markdown, translate_markdown_data  # noqa: F401
+
+with contextlib.suppress(ImportError):
+    from ocds_babel.translate_yaml import _prepare_yaml, translate_yaml, translate_yaml_data  # noqa: F401
+
+logger = logging.getLogger("ocds_babel")
+
+MANIFEST_FILENAME = ".ocds-babel-manifest.json"
+
+
+@dataclass
+class FileStats:
+    """Statistics about a file translated (or skipped) by :func:`translate`."""
+
+    #: The path of the input file
+    source: str
+    #: The path of the output file
+    path: str
+    #: The gettext domain
+    domain: str
+    #: The name of the translation method
+    method: str
+    #: Whether the file was skipped, because it is unchanged (see the ``incremental`` argument)
+    skipped: bool = False
+    #: Whether the output file was written, because its content changed (or it didn't exist)
+    written: bool = False
+    #: The wall time to translate the file, in seconds
+    seconds: float = 0.0
+    #: The size of the input file, in bytes
+    bytes_read: int = 0
+    #: The size of the output file, in bytes
+    bytes_written: int = 0
+    #: The number of messages looked up
+    lookups: int = 0
+    #: The number of messages looked up, whose translation is the message itself
+    untranslated: int = 0
+
+    @property
+    def translated(self):
+        """The number of messages looked up, whose translation differs from the message."""
+        return self.lookups - self.untranslated
+
+
+@dataclass
+class TranslationStats:
+    """Statistics returned by :func:`translate`."""
+
+    #: The target language
+    language: str
+    #: The statistics of each file, in order
+    files: list = field(default_factory=list)
+    #: The time to load each domain's message catalog, in seconds, summed across processes if ``jobs`` is set
+    catalogs: dict = field(default_factory=dict)
+    #: The wall time of the call, in seconds
+    seconds: float = 0.0
+    #: The number of lookups of messages that were already translated, and of messages that weren't
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def bytes_read(self):
+        """The total size of the input files, in bytes."""
+        return sum(stats.bytes_read for stats in self.files)
+
+    @property
+    def bytes_written(self):
+        """The total size of the output files, in bytes."""
+        return sum(stats.bytes_written for stats in self.files)
+
+    @property
+    def lookups(self):
+        """The total number of messages looked up."""
+        return sum(stats.lookups for stats in self.files)
+
+    @property
+    def translated(self):
+        """The total number of messages looked up, whose translation differs from the message."""
+        return sum(stats.translated for stats in self.files)
+
+    @property
+    def untranslated(self):
+        """The total number of messages looked up, whose translation is the message itself."""
+        return sum(stats.untranslated for stats in self.files)
+
+
+def translate(
+    configuration,
+    localedir,
+    language,
+    headers,
+    keys=None,
+    jobs=None,
+    incremental=False,  # noqa: FBT002
+    progress=None,
+    **kwargs,
+):
+    """
+    Write files, translating any translatable strings, and return a :class:`TranslationStats` object.
+
+    For translated strings in schema files, replace `{{lang}}` with the language code.
+
+    If ``jobs`` is greater than 1, translate files in parallel, using a pool of that many processes.
+
+    If ``incremental`` is ``True``, skip files whose source, message catalog, translation method and arguments are
+    unchanged since the previous call, as recorded in a manifest in each output directory.
+
+    If ``progress`` is set, call it with a :class:`FileStats` object as each file is translated or skipped.
+
+    Keyword arguments may specify additional replacements.
+    """
+    start = time.perf_counter()
+    stats = TranslationStats(language)
+    translators = {}
+    catalogs = {}
+    manifests = {}
+    futures = []
+    memo = TranslationMemo()
+
+    def done(file_stats):
+        stats.files.append(file_stats)
+        if progress:
+            progress(file_stats)
+
+    try:
+        with contextlib.ExitStack() as stack:
+            executor = stack.enter_context(ProcessPoolExecutor(jobs)) if jobs and jobs > 1 else None
+
+            for sources, target, domain in configuration:
+                logger.info('Translating to %s using "%s" domain, into %s', language, domain, target)
+
+                # Worker processes load their own message catalogs.
+                if not executor and domain not in translators:
+                    loaded = time.perf_counter()
+                    translators[domain] = _load_translator(domain, localedir, language)
+                    stats.catalogs[domain] = time.perf_counter() - loaded
+
+                os.makedirs(target, exist_ok=True)
+
+                if incremental:
+                    if domain not in catalogs:
+                        catalogs[domain] = _catalog_digest(domain, localedir, language)
+                    if target not in manifests:
+                        manifests[target] = _read_manifest(target)
+
+                for source in sources:
+                    basename = os.path.basename(source)
+                    path = os.path.join(target, basename)
+                    method, options, substitutions = _get_method(source, language, headers, keys, kwargs)
+
+                    if incremental:
+                        manifest = manifests[target]
+                        digest = _digest(source, catalogs[domain], method, options, substitutions)
+                        if manifest.get(basename) == digest and os.path.exists(path):
+                            logger.info("Skipping %s, which is unchanged", source)
+                            skipped = FileStats(source, path, domain, method.__name__, skipped=True)
+                            if executor:
+                                futures.append((None, skipped, None, None, None))
+                            else:
+                                done(skipped)
+                            continue
+                    else:
+                        manifest = digest = None
+
+                    args = (domain, method, source, path, options)
+                    if executor:
+                        future = executor.submit(_translate_file_in_worker, localedir, language, substitutions, *args)
+                        futures.append((future, None, manifest, basename, digest))
+                    else:
+                        translator = memo.bind(translators[domain], domain, language, **substitutions)
+                        file_stats = _translate_file(translator, *args)
+                        if manifest is not None:
+                            manifest[basename] = digest
+                        done(file_stats)
+
+            # Raise any error, and report progress, in the same order as without `jobs`.
+            for future, skipped, manifest, basename, digest in futures:
+                if future is None:
+                    done(skipped)
+                    continue
+                file_stats, hits, misses, seconds = future.result()
+                memo.hits += hits
+                memo.misses += misses
+                if seconds is not None:
+                    stats.catalogs[file_stats.domain] = stats.catalogs.get(file_stats.domain, 0) + seconds
+                if manifest is not None:
+                    manifest[basename] = digest
+                done(file_stats)
+
+        logger.debug("Translation memo: %d hits, %d misses", memo.hits, memo.misses)
+    finally:
+        # Record the files that were translated, even if another file failed.
+        for target, manifest in manifests.items():
+            _write_manifest(target, manifest)
+
+    stats.hits = memo.hits
+    stats.misses = memo.misses
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def translate_languages(configuration, localedir, languages, headers, keys=None, **kwargs):
+    """
+    Write files for each language, translating any translatable strings.
+
+    Unlike :func:`translate`, each file is read and parsed once, instead of once per language.
+
+    The output directory of each tuple in the configuration is a function that accepts a language code and returns a
+    path, e.g. :code:`lambda language: basedir / 'build' / language`.
+
+    For translated strings in schema files, replace `{{lang}}` with the language code.
+
+    Keyword arguments may specify additional replacements.
+    """
+    for sources, target, domain in configuration:
+        translators = {}
+        for language in languages:
+            logger.info('Translating to %s using "%s" domain, into %s', language, domain, target(language))
+
+            translators[language] = _load_translator(domain, localedir, language)
+
+            os.makedirs(target(language), exist_ok=True)
+
+        for source in sources:
+            with open(source) as r:
+                render = _get_preparer(source)(r, headers=headers, keys=keys)
+            for language, translator in translators.items():
+                path = os.path.join(target(language), os.path.basename(source))
+                text = render(translator, language, **kwargs)
+                _write_if_changed(path, lambda w, text=text: w.write(text))
+
+
+# Return the method, its keyword arguments, and the replacements of markers in its translated strings.
+def _get_method(source, language, headers, keys, kwargs):
+    basename = os.path.basename(source)
+    if basename == "extension.json":
+        return translate_extension_metadata_stream, {"lang": language}, {}
+    if source.endswith(".csv"):
+        return translate_codelist_stream, {"headers": headers}, {}
+    if source.endswith(".json"):
+        return translate_schema_stream, {}, dict(lang=language, **kwargs)
+    if source.endswith(".md"):
+        return translate_markdown, {}, {}
+    if source.endswith(".yaml"):
+        return translate_yaml, {"keys": keys}, kwargs
+    raise NotImplementedError(basename)
+
+
+def _get_preparer(source):
+    basename = os.path.basename(source)
+    if basename == "extension.json":
+        return _prepare_extension_metadata
+    if source.endswith(".csv"):
+        return _prepare_codelist
+    if source.endswith(".json"):
+        return _prepare_schema
+    if source.endswith(".md"):
+        return _prepare_markdown
+    if source.endswith(".yaml"):
+        return _prepare_yaml
+    raise NotImplementedError(basename)
+
+
+def _catalog_digest(domain, localedir, language):
+    path = gettext.find(domain, localedir, languages=[language])
+    if path is None:
+        return None
+    return _file_digest(path).hexdigest()
+
+
+def _digest(source, catalog, method, options, substitutions):
+    digest = _file_digest(source)
+    digest.update(repr((catalog, method.__name__, sorted(options.items()), sorted(substitutions.items()))).encode())
+    return digest.hexdigest()
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest
+
+
+def _read_manifest(target):
+    try:
+        with open(os.path.join(target, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(target, manifest):
+    with open(os.path.join(target, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+# Write to a temporary file, and replace the output file only if its content changed, so that its modification time
+# is preserved for downstream tools. Return whether the output file was written.
+def _write_if_changed(path, write):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w") as w:
+            write(w)
+        if os.path.exists(path) and filecmp.cmp(tmp, path, shallow=False):
+            os.remove(tmp)
+            return False
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+        raise
+    return True
+
+
+def _load_translator(domain, localedir, language):
+    return gettext.translation(domain, localedir, languages=[language], fallback=language == "en")
+
+
+def _translate_file(translator, domain, method, source, path, options):
+    start = time.perf_counter()
+    with open(source) as r:
+        if method in STREAM_METHODS:
+            written = _write_if_changed(path, lambda w: method(r, w, translator, **options))
+        else:
+            written = _write_if_changed(path, lambda w: w.write(method(r, translator, **options)))
+        bytes_read = os.fstat(r.fileno()).st_size
+    if not written:
+        logger.debug("Not writing %s, whose content is unchanged", path)
+    return FileStats(
+        source,
+        path,
+        domain,
+        method.__name__,
+        written=written,
+        seconds=time.perf_counter() - start,
+        bytes_read=bytes_read,
+        bytes_written=os.path.getsize(path),
+        lookups=translator.lookups,
+        untranslated=translator.untranslated,
+    )
+
+
+# Each worker process loads each message catalog once, and has one translation memo.
+_worker_translators = {}
+_worker_memo = TranslationMemo()
+
+
+def _translate_file_in_worker(localedir, language, substitutions, domain, *args):
+    key = (domain, localedir, language)
+    if key in _worker_translators:
+        seconds = None
+    else:
+        start = time.perf_counter()
+        _worker_translators[key] = _load_translator(domain, localedir, language)
+        seconds = time.perf_counter() - start
+
+    hits, misses = _worker_memo.hits, _worker_memo.misses
+    translator = _worker_memo.bind(_worker_translators[key], domain, language, **substitutions)
+    file_stats = _translate_file(translator, domain, *args)
+    return file_stats, _worker_memo.hits - hits, _worker_memo.misses - misses, seconds
+
+
+# This should roughly match the logic of `extract_codelist`.
+def translate_codelist(io, translator, headers=(), **kwargs):
+    """Accept a CSV file as an IO object, and return its translated contents in CSV format."""
+    output = StringIO()
+    translate_codelist_stream(io, output, translator, headers, **kwargs)
+    return output.getvalue()
+
+
+def translate_codelist_stream(io, output, translator, headers=(), **kwargs):
+    """Accept a CSV file as an IO object, and write its translated contents in CSV format to the output IO object."""
+    reader = csv.DictReader(io)
+
+    fieldnames = [translator.gettext(fieldname) for fieldname in reader.fieldnames]
+    rows = translate_codelist_data_iter(reader, translator, headers, **kwargs)
+
+    _csv_dump(fieldnames, rows, output)
+
+
+def _prepare_codelist(io, headers=(), **kwargs):
+    reader = csv.DictReader(io)
+    rows = list(reader)
+
+    def render(translator, language, **kwargs):
+        fieldnames = [translator.gettext(fieldname) for fieldname in reader.fieldnames]
+        return _csv_dumps(fieldnames, translate_codelist_data(rows, translator, headers, **kwargs))
+
+    return render
+
+
+def translate_codelist_data(source, translator, headers=(), **kwargs):
+    """Accept CSV rows as an iterable object (e.g. a list of dictionaries), and return translated rows."""
+    return list(translate_codelist_data_iter(source, translator, headers, **kwargs))
+
+
+def translate_codelist_data_iter(source, translator, headers=(), **kwargs):
+    """Accept CSV rows as an iterable object (e.g. a CSV reader), and yield translated rows."""
+    for row in source:
+        data = {}
+        for key, value in row.items():
+            text = text_to_translate(value, key in headers)
+            data[translator.gettext(key)] = translator.gettext(text) if text else value
+        yield data
+
+
+# This should roughly match the logic of `extract_schema`.
+def translate_schema(io, translator, **kwargs):
+    """Accept a JSON file as an IO object, and return its translated contents in JSON format."""
+    data = json_loads(io.read())
+
+    data = translate_schema_data(data, translator, inplace=True, **kwargs)
+
+    return json_dumps(data)
+
+
+def translate_schema_stream(io, output, translator, **kwargs):
+    """
+    Accept a JSON file as an IO object, and write its translated contents in JSON format to an output IO object.
+
+    Unlike :func:`translate_schema`, the output is written in chunks, instead of being serialized in memory.
+    """
+    data = json_loads(io.read())
+
+    json_dump(translate_schema_data(data, translator, inplace=True, **kwargs), output)
+
+
+def _prepare_schema(io, **kwargs):
+    data = json_loads(io.read())
+    locations = translatable_locations(data, TRANSLATABLE_SCHEMA_KEYWORDS)
+
+    def render(translator, language, **kwargs):
+        # Overwrite the same locations for each language, instead of copying the data.
+        translate_locations(locations, translator, lang=language, **kwargs)
+        return json_dumps(data)
+
+    return render
+
+
+def translate_schema_data(source, translator, inplace=False, **kwargs):  # noqa: FBT002
+    """
+    Accept JSON data, and return translated data.
+
+    If ``inplace`` is ``True``, translate and return the data itself, instead of a copy.
+    """
+    data = source if inplace else deepcopy(source)
+    translate_locations(translatable_locations(data, TRANSLATABLE_SCHEMA_KEYWORDS), translator, **kwargs)
+    return data
+
+
+def compile_schema_plan(source):
+    """
+    Accept JSON data, and return a plan for :func:`translate_schema_plan`.
+
+    The plan is a list of the paths to translatable strings. Each path is a list of object keys and array indices. The
+    plan can be serialized as JSON, to reuse it without walking the data.
+    """
+    return translatable_paths(source, TRANSLATABLE_SCHEMA_KEYWORDS)
+
+
+def translate_schema_plan(source, plan, translator, **kwargs):
+    """
+    Accept JSON data and its plan from :func:`compile_schema_plan`, and return translated data.
+
+    Only the objects and arrays that contain translatable strings are copied. The translated data shares all other
+    objects and arrays with the source.
+    """
+    data = copy_paths(source, plan)
+    translate_locations(locations_from_paths(data, plan), translator, **kwargs)
+    return data
+
+
+# This should roughly match the logic of `extract_extension_metadata`.
+def translate_extension_metadata(io, translator, lang="en", **kwargs):
+    """Accept an extension metadata file as an IO object, and return its translated contents in JSON format."""
+    data = json_loads(io.read())
+
+    data = translate_extension_metadata_data(data, translator, lang, **kwargs)
+
+    return json_dumps(data)
+
+
+def translate_extension_metadata_stream(io, output, translator, lang="en", **kwargs):
+    """Accept an extension metadata file as an IO object, and write its translated contents to an output IO object."""
+    data = json_loads(io.read())
+
+    json_dump(translate_extension_metadata_data(data, translator, lang, **kwargs), output)
+
+
+def _prepare_extension_metadata(io, **kwargs):
+    data = json_loads(io.read())
+
+    def render(translator, language, **kwargs):
+        return json_dumps(translate_extension_metadata_data(data, translator, language, **kwargs))
+
+    return render
+
+
+def translate_extension_metadata_data(source, translator, lang="en", **kwargs):
+    """Accept extension metadata, and return translated metadata."""
+    data = deepcopy(source)
+
+    for key in TRANSLATABLE_EXTENSION_METADATA_KEYWORDS:
+        value = data.get(key)
+
+        if isinstance(value, dict):
+            value = value.get("en")
+
+        text = text_to_translate(value)
+        if text:
+            data[key] = {lang: translator.gettext(text)}
+
+    return data
+
+
+def _csv_dumps(fieldnames, rows):
+    io = StringIO()
+    _csv_dump(fieldnames, rows, io)
+    return io.getvalue()
+
+
+def _csv_dump(fieldnames, rows, io):
+    writer = csv.DictWriter(io, fieldnames, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+# Methods that write to an output IO object, instead of returning a string.
+STREAM_METHODS = {translate_codelist_stream, translate_extension_metadata_stream, translate_schema_stream}
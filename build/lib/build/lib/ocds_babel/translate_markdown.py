@@ -0,0 +1,132 @@
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+
+from markdown_it import MarkdownIt
+from mdformat.renderer import DEFAULT_RENDERERS, MDRenderer, RenderContext, RenderTreeNode
+
+# Parsers and renderers are reused across calls, but not shared between threads.
+_local = threading.local()
+
+# The maximum number of rendered blocks to cache.
+BLOCK_CACHE_SIZE = 4096
+
+# Rendered blocks are cached by their source, translations, and list marker.
+_block_cache = OrderedDict()
+_block_cache_lock = threading.Lock()
+
+# Like `markdown_it.rules_core.normalize`, to match the line numbers of tokens.
+NEWLINES = re.compile(r"\r\n?|\n")
+
+
+def translate_markdown(io, translator, **kwargs):
+    """Accept a Markdown file as an IO object, and return its translated contents in Markdown format."""
+    name = io.name
+    text = io.read()
+
+    return translate_markdown_data(name, text, translator, **kwargs)
+
+
+def translate_markdown_data(name, md, translator, **kwargs):
+    """Accept a Markdown file as its filename and contents, and return its translated contents in Markdown format."""
+    env = {}
+
+    return _translate_markdown_tokens(_lines(md), _parser().parse(md, env), env, translator)
+
+
+def _translate_markdown_tokens(lines, source, env, translator):
+    tokens = []
+    # The source lines and translations of each top-level block.
+    blocks = []
+    for token in source:
+        if token.level == 0 and token.nesting >= 0:
+            blocks.append((token.map, []))
+        if token.type == "inline":
+            translation = translator.gettext(token.content)
+            blocks[-1][1].append(translation)
+            tokens.append(_parse_inline(translation).copy(level=token.level))
+        else:
+            tokens.append(token)
+
+    # Reference definitions are rendered after all blocks, in which references are used.
+    if env.get("references") or any(block_map is None for block_map, _ in blocks):
+        return _renderer().render(tokens, _parser().options, env)
+
+    return _render_blocks(lines, RenderTreeNode(tokens).children, blocks, env)
+
+
+# This should match the logic of `MDRenderer.render`, with the default renderers.
+def _render_blocks(lines, nodes, blocks, env):
+    env["indent_width"] = 0
+    env["used_refs"] = set()
+    context = RenderContext(DEFAULT_RENDERERS, MappingProxyType({}), _parser().options, env)
+
+    outputs = []
+    previous_type = None
+    consecutive = 0
+    for node, ((start, end), translations) in zip(nodes, blocks, strict=True):
+        # Consecutive lists alternate between list markers.
+        if node.type == previous_type and node.type in {"bullet_list", "ordered_list"}:
+            consecutive += 1
+        else:
+            consecutive = 0
+        previous_type = node.type
+
+        key = ("\n".join(lines[start:end]), consecutive % 2, *translations)
+        with _block_cache_lock:
+            output = _block_cache.get(key)
+            if output is not None:
+                _block_cache.move_to_end(key)
+        if output is None:
+            output = node.render(context)
+            with _block_cache_lock:
+                _block_cache[key] = output
+                if len(_block_cache) > BLOCK_CACHE_SIZE:
+                    _block_cache.popitem(last=False)
+        if output:
+            outputs.append(output)
+
+    text = "\n\n".join(outputs)
+    if text:
+        text += "\n"
+    return text
+
+
+def _lines(md):
+    return NEWLINES.split(md)
+
+
+def _prepare_markdown(io, **kwargs):
+    env = {}
+    md = io.read()
+    tokens = _parser().parse(md, env)
+
+    def render(translator, language, **kwargs):
+        return _translate_markdown_tokens(_lines(md), tokens, env, translator)
+
+    return render
+
+
+def _parser():
+    try:
+        return _local.parser
+    except AttributeError:
+        _local.parser = MarkdownIt()
+        return _local.parser
+
+
+def _renderer():
+    try:
+        return _local.renderer
+    except AttributeError:
+        _local.renderer = MDRenderer()
+        return _local.renderer
+
+
+# Translated text is inline content, like the content of the inline token that it replaces. Like a paragraph's
+# content, leading and trailing whitespace is ignored. The cached tokens must not be modified.
+@lru_cache(maxsize=4096)
+def _parse_inline(text):
+    return _parser().parseInline(text.strip())[0]
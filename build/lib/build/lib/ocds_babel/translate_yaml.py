@@ -0,0 +1,57 @@
+from copy import deepcopy
+
+import yaml
+
+from ocds_babel.util import translatable_locations, translate_locations
+
+# libyaml's emitter wraps and escapes some strings differently, so only its parser is used, to keep output identical.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML was built without libyaml
+    from yaml import SafeLoader
+
+
+def yaml_backend():
+    """Return ``"libyaml"`` if YAML files are parsed by the libyaml C library, or ``"python"`` otherwise."""
+    return "libyaml" if SafeLoader.__module__ == "yaml.cyaml" else "python"
+
+
+# This should roughly match the logic of `extract_yaml`.
+def translate_yaml(io, translator, keys=(), **kwargs):
+    """Accept a YAML file as an IO object, and return its translated contents in YAML format."""
+    data = _yaml_load(io)
+
+    data = translate_yaml_data(data, translator, keys, inplace=True, **kwargs)
+
+    return _yaml_dump(data)
+
+
+def _prepare_yaml(io, keys=(), **kwargs):
+    data = _yaml_load(io)
+    locations = translatable_locations(data, keys)
+
+    def render(translator, language, **kwargs):
+        # Overwrite the same locations for each language, instead of copying the data.
+        translate_locations(locations, translator, **kwargs)
+        return _yaml_dump(data)
+
+    return render
+
+
+def translate_yaml_data(source, translator, keys=(), inplace=False, **kwargs):  # noqa: FBT002
+    """
+    Accept YAML data, and return translated data.
+
+    If ``inplace`` is ``True``, translate and return the data itself, instead of a copy.
+    """
+    data = source if inplace else deepcopy(source)
+    translate_locations(translatable_locations(data, keys), translator, **kwargs)
+    return data
+
+
+def _yaml_load(stream):
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def _yaml_dump(data):
+    return yaml.safe_dump(data, default_flow_style=False, allow_unicode=True)
@@ -0,0 +1,2 @@
+TRANSLATABLE_SCHEMA_KEYWORDS = ("title", "description")
+TRANSLATABLE_EXTENSION_METADATA_KEYWORDS = ("name", "description")
@@ -0,0 +1,136 @@
+"""Parse JSON incrementally, without reading the whole document into memory."""
+
+import re
+from json.decoder import scanstring
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+LITERALS = {
+    "true": ("boolean", True),
+    "false": ("boolean", False),
+    "null": ("null", None),
+    "NaN": ("number", float("nan")),
+    "Infinity": ("number", float("inf")),
+    "-Infinity": ("number", float("-inf")),
+}
+PUNCTUATION = set("{}[],:")
+
+
+class JSONStreamError(ValueError):
+    """Raised if the JSON is invalid."""
+
+    def __init__(self, message, lineno, colno):  # noqa: D107
+        super().__init__(f"{message}: line {lineno} column {colno}")
+        self.lineno = lineno
+        self.colno = colno
+
+
+# Expectations of the parser.
+VALUE = 1
+VALUE_OR_END = 2
+KEY = 3
+KEY_OR_END = 4
+COLON = 5
+COMMA_OR_END = 6
+DONE = 7
+
+
+def iterparse(stream):
+    """
+    Accept JSON as a text IO object, and yield ``(lineno, event, value)`` tuples, in document order.
+
+    The events are ``start_map``, ``map_key``, ``end_map``, ``start_array``, ``end_array``, ``string``, ``number``,
+    ``boolean`` and ``null``. Only the ``map_key`` and scalar events have values.
+
+    The stream is read one line at a time, so memory use is bounded by the longest line and the nesting depth.
+
+    :raises JSONStreamError: if the JSON is invalid
+    """
+    stack = []
+    expect = VALUE
+    lineno = 0
+
+    for lineno, line in enumerate(stream, 1):
+        for position, kind, value in _tokenize(line, lineno):
+            if expect in {VALUE, VALUE_OR_END}:
+                if kind == "]" and expect == VALUE_OR_END:
+                    stack.pop()
+                    yield lineno, "end_array", None
+                elif kind == "{":
+                    stack.append(kind)
+                    yield lineno, "start_map", None
+                    expect = KEY_OR_END
+                    continue
+                elif kind == "[":
+                    stack.append(kind)
+                    yield lineno, "start_array", None
+                    expect = VALUE_OR_END
+                    continue
+                elif kind not in PUNCTUATION:
+                    yield lineno, kind, value
+                else:
+                    _error("Expecting value", lineno, position)
+            elif expect in {KEY, KEY_OR_END}:
+                if kind == "string":
+                    yield lineno, "map_key", value
+                    expect = COLON
+                    continue
+                if kind == "}" and expect == KEY_OR_END:
+                    stack.pop()
+                    yield lineno, "end_map", None
+                else:
+                    _error("Expecting property name enclosed in double quotes", lineno, position)
+            elif expect == COLON:
+                if kind != ":":
+                    _error("Expecting ':' delimiter", lineno, position)
+                expect = VALUE
+                continue
+            elif expect == COMMA_OR_END:
+                if kind == ",":
+                    expect = KEY if stack[-1] == "{" else VALUE
+                    continue
+                if (kind, stack[-1]) in {("}", "{"), ("]", "[")}:
+                    stack.pop()
+                    yield lineno, "end_map" if kind == "}" else "end_array", None
+                else:
+                    _error("Expecting ',' delimiter", lineno, position)
+            else:
+                _error("Extra data", lineno, position)
+
+            # A value was completed.
+            expect = COMMA_OR_END if stack else DONE
+
+    if expect != DONE:
+        _error("Expecting value", lineno + 1, 0)
+
+
+def _tokenize(line, lineno):
+    end = len(line)
+    position = WHITESPACE.match(line).end()
+    while position < end:
+        char = line[position]
+        if char == '"':
+            value, next_position = scanstring(line, position + 1)
+            yield position, "string", value
+        elif char in PUNCTUATION:
+            next_position = position + 1
+            yield position, char, None
+        else:
+            match = NUMBER.match(line, position)
+            if match:
+                number, fraction, exponent = match.group(), *match.groups()
+                next_position = match.end()
+                yield position, "number", float(number) if fraction or exponent else int(number)
+            else:
+                for literal, (kind, value) in LITERALS.items():
+                    if line.startswith(literal, position):
+                        next_position = position + len(literal)
+                        yield position, kind, value
+                        break
+                else:
+                    _error("Expecting value", lineno, position)
+        position = WHITESPACE.match(line, next_position).end()
+
+
+def _error(message, lineno, position):
+    raise JSONStreamError(message, lineno, position + 1)
@@ -0,0 +1,199 @@
+"""
+Translate files and data without blocking the event loop, for example, in an async web service.
+
+Each coroutine runs its counterpart in :mod:`ocds_babel.translate` in an executor, and accepts the same arguments:
+
+.. code:: python
+
+    import asyncio
+
+    from ocds_babel import translate_async
+
+    limiter = asyncio.Semaphore(4)
+
+
+    async def localized_schema(schema, translator, language):
+        return await translate_async.translate_schema_data(schema, translator, limiter=limiter, lang=language)
+
+The ``executor`` keyword argument is the executor in which to run, by default the event loop's default executor (a
+thread pool). A thread keeps the event loop responsive. To translate large documents in parallel, set it to a
+:class:`concurrent.futures.ProcessPoolExecutor`, in which case the arguments (including the translator) and the
+results must be picklable. IO objects, ``gettext.GNUTranslations`` objects and
+:class:`~ocds_babel.translations.MappedTranslations` objects are not.
+
+The ``limiter`` keyword argument is an :class:`asyncio.Semaphore`, to limit the number of concurrent translations.
+
+If a coroutine is cancelled before its translation starts, the translation doesn't run. Once started, it runs to
+completion in the executor, and its result is discarded.
+
+:func:`translate` reads, translates and writes each file in the executor, as a separate task, and writes files
+concurrently, up to the ``limiter``'s value. If cancelled, files that haven't started aren't written.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+
+import ocds_babel.translate
+from ocds_babel.translate import TranslationStats, _get_method, _load_translator, _translate_file
+from ocds_babel.translations import TranslationMemo
+
+logger = logging.getLogger("ocds_babel")
+
+
+async def translate(
+    configuration,
+    localedir,
+    language,
+    headers,
+    keys=None,
+    progress=None,
+    *,
+    executor=None,
+    limiter=None,
+    **kwargs,
+):
+    """
+    Like :func:`ocds_babel.translate.translate`, without blocking the event loop.
+
+    ``executor`` must be a thread pool, or ``None``, as translators are shared between files.
+    """
+    start = time.perf_counter()
+    stats = TranslationStats(language)
+    translators = {}
+    memo = TranslationMemo()
+    tasks = []
+
+    try:
+        for sources, target, domain in configuration:
+            logger.info('Translating to %s using "%s" domain, into %s', language, domain, target)
+
+            if domain not in translators:
+                loaded = time.perf_counter()
+                translators[domain] = await _run(executor, None, _load_translator, domain, localedir, language)
+                stats.catalogs[domain] = time.perf_counter() - loaded
+
+            await _run(executor, None, os.makedirs, target, exist_ok=True)
+
+            for source in sources:
+                path = os.path.join(target, os.path.basename(source))
+                method, options, substitutions = _get_method(source, language, headers, keys, kwargs)
+                translator = memo.bind(translators[domain], domain, language, **substitutions)
+                args = (translator, domain, method, source, path, options)
+                tasks.append(asyncio.ensure_future(_run(executor, limiter, _translate_file, *args)))
+
+        # Raise any error, and report progress, in the same order as the configuration.
+        for task in tasks:
+            file_stats = await task
+            stats.files.append(file_stats)
+            if progress:
+                progress(file_stats)
+    finally:
+        # Don't start the remaining files, if cancelled or if a file failed.
+        for task in tasks:
+            task.cancel()
+
+    logger.debug("Translation memo: %d hits, %d misses", memo.hits, memo.misses)
+
+    stats.hits = memo.hits
+    stats.misses = memo.misses
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+async def translate_codelist(io, translator, headers=(), *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate.translate_codelist`, without blocking the event loop."""
+    method = ocds_babel.translate.translate_codelist
+    return await _run(executor, limiter, method, io, translator, headers, **kwargs)
+
+
+async def translate_codelist_data(source, translator, headers=(), *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate.translate_codelist_data`, without blocking the event loop."""
+    method = ocds_babel.translate.translate_codelist_data
+    return await _run(executor, limiter, method, source, translator, headers, **kwargs)
+
+
+async def translate_schema(io, translator, *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate.translate_schema`, without blocking the event loop."""
+    return await _run(executor, limiter, ocds_babel.translate.translate_schema, io, translator, **kwargs)
+
+
+async def translate_schema_data(
+    source,
+    translator,
+    inplace=False,  # noqa: FBT002
+    *,
+    executor=None,
+    limiter=None,
+    **kwargs,
+):
+    """Like :func:`ocds_babel.translate.translate_schema_data`, without blocking the event loop."""
+    method = ocds_babel.translate.translate_schema_data
+    return await _run(executor, limiter, method, source, translator, inplace, **kwargs)
+
+
+async def translate_schema_plan(source, plan, translator, *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate.translate_schema_plan`, without blocking the event loop."""
+    method = ocds_babel.translate.translate_schema_plan
+    return await _run(executor, limiter, method, source, plan, translator, **kwargs)
+
+
+async def translate_extension_metadata(io, translator, lang="en", *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate.translate_extension_metadata`, without blocking the event loop."""
+    method = ocds_babel.translate.translate_extension_metadata
+    return await _run(executor, limiter, method, io, translator, lang, **kwargs)
+
+
+async def translate_extension_metadata_data(source, translator, lang="en", *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate.translate_extension_metadata_data`, without blocking the event loop."""
+    method = ocds_babel.translate.translate_extension_metadata_data
+    return await _run(executor, limiter, method, source, translator, lang, **kwargs)
+
+
+async def translate_markdown(io, translator, *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate_markdown.translate_markdown`, without blocking the event loop."""
+    from ocds_babel.translate_markdown import translate_markdown  # noqa: PLC0415
+
+    return await _run(executor, limiter, translate_markdown, io, translator, **kwargs)
+
+
+async def translate_markdown_data(name, md, translator, *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate_markdown.translate_markdown_data`, without blocking the event loop."""
+    from ocds_babel.translate_markdown import translate_markdown_data  # noqa: PLC0415
+
+    return await _run(executor, limiter, translate_markdown_data, name, md, translator, **kwargs)
+
+
+async def translate_yaml(io, translator, keys=(), *, executor=None, limiter=None, **kwargs):
+    """Like :func:`ocds_babel.translate_yaml.translate_yaml`, without blocking the event loop."""
+    from ocds_babel.translate_yaml import translate_yaml  # noqa: PLC0415
+
+    return await _run(executor, limiter, translate_yaml, io, translator, keys, **kwargs)
+
+
+async def translate_yaml_data(
+    source,
+    translator,
+    keys=(),
+    inplace=False,  # noqa: FBT002
+    *,
+    executor=None,
+    limiter=None,
+    **kwargs,
+):
+    """Like :func:`ocds_babel.translate_yaml.translate_yaml_data`, without blocking the event loop."""
+    from ocds_babel.translate_yaml import translate_yaml_data  # noqa: PLC0415
+
+    return await _run(executor, limiter, translate_yaml_data, source, translator, keys, inplace, **kwargs)
+
+
+async def _run(executor, limiter, function, *args, **kwargs):
+    # Keyword arguments are bound with `functools.partial`, which is picklable, unlike a lambda.
+    call = functools.partial(function, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    if limiter is None:
+        return await loop.run_in_executor(executor, call)
+    async with limiter:
+        return await loop.run_in_executor(executor, call)
@@ -11,6 +11,14 @@ and in ``babel_ocds_schema.cfg``::
 
     [ocds_schema: schema/*/*-schema.json]
 
+To extract messages from very large JSON Schema files, without reading each file into memory, set the ``stream``
+option. Messages then have accurate line numbers::
+
+    [ocds_schema: schema/*/*-schema.json]
+    stream = true
+
+Streaming trades speed for memory: it is several times slower than the default, so set it only if memory is limited.
+
 For BODS, you can specify in ``babel_bods_codelist.cfg``::
 
     [ocds_codelist: schema/codelists/*.csv]
@@ -26,57 +34,258 @@ For OC4IDS, you can specify in a Babel ``.cfg`` file::
     yaml = ocds_babel.extract:extract_yaml
     [yaml: mapping/sustainability.yaml]
     keys = title,disclosure format,mapping
+
+To extract the unique messages from many files, with a compact list of the occurrences of each message, instead of a
+tuple per occurrence, use :code:`extract_unique`:
+
+.. code:: python
+
+    from ocds_babel.extract import extract_schema, extract_unique
+
+    messages = extract_unique(glob('schema/*/*-schema.json'), extract_schema)
+    for text, message in messages.items():
+        for occurrence in message.occurrences:
+            print(text, occurrence.filename, occurrence.lineno, occurrence.comment)
+
+To re-use the messages extracted from unchanged files, set the ``cache_dir`` option of any extractor. Files are
+looked up by the hash of their content, the extractor, the file's basename and the other options. If the cache exceeds
+``cache_size`` megabytes (100, by default), the least recently used files are evicted::
+
+    [ocds_schema: schema/*/*-schema.json]
+    cache_dir = .cache/ocds-babel
+    cache_size = 200
 """
 
+import contextlib
 import csv
+import functools
+import hashlib
 import json
 import os
-from io import StringIO
 
 from ocds_babel import TRANSLATABLE_EXTENSION_METADATA_KEYWORDS, TRANSLATABLE_SCHEMA_KEYWORDS
-from ocds_babel.util import text_to_translate
+from ocds_babel.jsonstream import iterparse
+from ocds_babel.util import Path, json_loads, text_stream, text_to_translate, translatable
+
+#: Increment if the messages yielded by an extractor change, to invalidate the extraction cache.
+CACHE_VERSION = 1
+CACHE_OPTIONS = {"cache_dir", "cache_size"}
+#: The default maximum size of the extraction cache, in megabytes.
+DEFAULT_CACHE_SIZE = 100
+
+# The estimated size of each cache directory, in bytes.
+_cache_usage = {}
+
+
+class Message:
+    """A unique message, and its occurrences, from :func:`extract_unique`."""
+
+    __slots__ = ("occurrences", "text")
+
+    def __init__(self, text):  # noqa: D107
+        self.text = text
+        self.occurrences = []
+
+
+class Occurrence:
+    """An occurrence of a message, from :func:`extract_unique`."""
+
+    __slots__ = ("filename", "lineno", "location")
+
+    def __init__(self, filename, lineno, location):  # noqa: D107
+        self.filename = filename
+        self.lineno = lineno
+        # A string, a Path (whose JSON Pointer is built on demand), or None.
+        self.location = location
+
+    @property
+    def comment(self):
+        """Return the comment (a JSON Pointer or a CSV header) that an extractor yields with the message, if any."""
+        return _comment(self.location)
+
+
+def extract_unique(filenames, method, options=None):
+    """
+    Return the unique messages in the files, as a dict of message text to :class:`Message`, in order of appearance.
+
+    ``method`` is one of this module's extractors, and ``options`` are its options.
+
+    Unlike calling the extractor on each file, each message is stored once, with a compact list of its occurrences.
+    The JSON Pointers of occurrences share the keys of their ancestors, and are built only if needed.
+    """
+    messages = {}
+    generator = EXTRACTORS[method]
+    for filename in filenames:
+        with open(filename, "rb") as fileobj:
+            for lineno, text, location in generator(fileobj, options):
+                message = messages.get(text)
+                if message is None:
+                    message = messages[text] = Message(text)
+                message.occurrences.append(Occurrence(filename, lineno, location))
+    return messages
+
+
+def _cached(extractor):
+    @functools.wraps(extractor)
+    def wrapper(fileobj, keywords, comment_tags, options):
+        if options and options.get("cache_dir"):
+            return _extract_cached(extractor, fileobj, keywords, comment_tags, options)
+        return extractor(fileobj, keywords, comment_tags, options)
+
+    return wrapper
+
 
+def _extract_cached(extractor, fileobj, keywords, comment_tags, options):
+    directory = options["cache_dir"]
+    limit = float(options.get("cache_size", DEFAULT_CACHE_SIZE)) * 1024 * 1024
 
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(65536), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    # The codelist extractor's "ignore" option depends on the file's basename.
+    key = (
+        CACHE_VERSION,
+        extractor.__name__,
+        os.path.basename(getattr(fileobj, "name", "")),
+        sorted((name, value) for name, value in options.items() if name not in CACHE_OPTIONS),
+    )
+    digest.update(repr(key).encode())
+    name = digest.hexdigest()
+    path = os.path.join(directory, name[:2], f"{name}.json")
+
+    try:
+        with open(path, "rb") as f:
+            messages = json.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        pass
+    else:
+        # Evict the least recently used files first.
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return [tuple(message) for message in messages]
+
+    messages = list(extractor(fileobj, keywords, comment_tags, options))
+    _write_cache(directory, path, json.dumps(messages, ensure_ascii=False).encode(), limit)
+    return messages
+
+
+def _write_cache(directory, path, data, limit):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write atomically, in case another process reads the file.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+    # Scan the cache once per process, and then add the size of each file written.
+    usage = _cache_usage.get(directory)
+    if usage is None:
+        usage = sum(size for _, size, _ in _cache_entries(directory))
+    else:
+        usage += len(data)
+
+    if usage > limit:
+        entries = sorted(_cache_entries(directory))
+        usage = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            # Leave room for new files, to not scan the cache after each write.
+            if usage <= limit * 0.9:
+                break
+            if entry != path:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(entry)
+                usage -= size
+
+    _cache_usage[directory] = usage
+
+
+def _cache_entries(directory):
+    for subdirectory in os.scandir(directory):
+        if subdirectory.is_dir():
+            for entry in os.scandir(subdirectory.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+
+@_cached
 def extract_codelist(fileobj, keywords, comment_tags, options):
     """Yield each header, and the values of the specified fields of a codelist CSV file."""
+    for lineno, text, location in _codelist_messages(fileobj, options):
+        yield lineno, "", text, "" if location is None else [location]
+
+
+def _codelist_messages(fileobj, options):
     headers = _get_option_as_list(options, "headers")
     ignore = _get_option_as_list(options, "ignore")
 
-    # Use universal newlines mode, to avoid parsing errors.
-    reader = csv.DictReader(StringIO(fileobj.read().decode(), newline=""))
-    for fieldname in reader.fieldnames:
-        if fieldname:
-            yield 0, "", fieldname, ""
+    # Decode rows as they are read. The csv module handles newlines, to avoid parsing errors.
+    with text_stream(fileobj, newline="") as stream:
+        reader = csv.DictReader(stream)
+        for fieldname in reader.fieldnames:
+            if fieldname:
+                yield 0, fieldname, None
 
-    if os.path.basename(fileobj.name) not in ignore:
-        for lineno, row in enumerate(reader, 1):
-            for key, value in row.items():
-                text = text_to_translate(value, key in headers)
-                if text:
-                    yield lineno, "", text, [key]
+        if os.path.basename(fileobj.name) not in ignore:
+            for lineno, row in enumerate(reader, 1):
+                for key, value in row.items():
+                    text = text_to_translate(value, key in headers)
+                    if text:
+                        yield lineno, text, key
 
 
+@_cached
 def extract_schema(fileobj, keywords, comment_tags, options):
     """Yield the "title" and "description" values of a JSON Schema file."""
+    for lineno, text, location in _schema_messages(fileobj, options):
+        yield lineno, "", text, [_comment(location)]
 
-    def _extract_schema(data, pointer):
-        if isinstance(data, list):
-            for index, item in enumerate(data):
-                yield from _extract_schema(item, pointer=f"{pointer}/{index}")
-        elif isinstance(data, dict):
-            for key, value in data.items():
-                new_pointer = f"{pointer}/{key}"
-                yield from _extract_schema(value, pointer=new_pointer)
-                text = text_to_translate(value, key in TRANSLATABLE_SCHEMA_KEYWORDS)
-                if text:
-                    yield 1, "", text, [new_pointer]
 
-    yield from _extract_schema(json.loads(fileobj.read().decode()), "")
+def _schema_messages(fileobj, options):
+    if options and options.get("stream") == "true":
+        yield from _extract_schema_stream(fileobj)
+        return
 
+    for _, key, path, text in translatable(json_loads(fileobj.read()), TRANSLATABLE_SCHEMA_KEYWORDS):
+        yield 1, text, Path(path, key)
 
+
+def _extract_schema_stream(fileobj):
+    # The last item is the current object key or array index.
+    path = []
+
+    with text_stream(fileobj) as stream:
+        for lineno, event, value in iterparse(stream):
+            if event == "map_key":
+                path[-1] = value
+                continue
+            if event in {"end_map", "end_array"}:
+                path.pop()
+                continue
+
+            if path and isinstance(path[-1], int):
+                path[-1] += 1
+
+            if event == "start_map":
+                path.append(None)
+            elif event == "start_array":
+                path.append(-1)
+            elif path and isinstance(path[-1], str):
+                text = text_to_translate(value, path[-1] in TRANSLATABLE_SCHEMA_KEYWORDS)
+                if text:
+                    yield lineno, text, "/" + "/".join(map(str, path))
+
+
+@_cached
 def extract_extension_metadata(fileobj, keywords, comment_tags, options):
     """Yield the "name" and "description" values of an extension.json file."""
-    data = json.loads(fileobj.read().decode())
+    for lineno, text, location in _extension_metadata_messages(fileobj, options):
+        yield lineno, "", text, [location]
+
+
+def _extension_metadata_messages(fileobj, options):
+    data = json_loads(fileobj.read())
     for key in TRANSLATABLE_EXTENSION_METADATA_KEYWORDS:
         value = data.get(key)
 
@@ -89,31 +298,41 @@ def extract_extension_metadata(fileobj, keywords, comment_tags, options):
 
         text = text_to_translate(value)
         if text:
-            yield 1, "", text, [comment]
+            yield 1, text, comment
 
 
+@_cached
 def extract_yaml(fileobj, keywords, comment_tags, options):
     """Yield the values of the specified keys of a YAML file."""
-    import yaml  # noqa: PLC0415
+    for lineno, text, location in _yaml_messages(fileobj, options):
+        yield lineno, "", text, [_comment(location)]
+
+
+def _yaml_messages(fileobj, options):
+    from ocds_babel.translate_yaml import _yaml_load  # noqa: PLC0415
 
     keys = _get_option_as_list(options, "keys")
 
-    def _extract_yaml(data, pointer):
-        if isinstance(data, list):
-            for index, item in enumerate(data):
-                yield from _extract_yaml(item, pointer=f"{pointer}/{index}")
-        elif isinstance(data, dict):
-            for key, value in data.items():
-                new_pointer = f"{pointer}/{key}"
-                yield from _extract_yaml(value, pointer=new_pointer)
-                text = text_to_translate(value, key in keys)
-                if text:
-                    yield 1, "", text, [new_pointer]
+    for _, key, path, text in translatable(_yaml_load(fileobj), keys):
+        yield 1, text, Path(path, key)
 
-    yield from _extract_yaml(yaml.safe_load(fileobj.read().decode()), "")
+
+def _comment(location):
+    if isinstance(location, Path):
+        return location.pointer()
+    return location
 
 
 def _get_option_as_list(options, key):
     if options:
         return options.get(key, "").split(",")
     return []
+
+
+# The generators of each extractor, which yield the line number, message text and location of each message.
+EXTRACTORS = {
+    extract_codelist: _codelist_messages,
+    extract_schema: _schema_messages,
+    extract_extension_metadata: _extension_metadata_messages,
+    extract_yaml: _yaml_messages,
+}
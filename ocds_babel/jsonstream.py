@@ -0,0 +1,200 @@
+"""Parse JSON incrementally, without reading the whole document into memory."""
+
+import re
+from json.decoder import scanstring
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+LITERALS = {
+    "true": ("boolean", True),
+    "false": ("boolean", False),
+    "null": ("null", None),
+    "NaN": ("number", float("nan")),
+    "Infinity": ("number", float("inf")),
+    "-Infinity": ("number", float("-inf")),
+}
+PUNCTUATION = set("{}[],:")
+# The end of a number or literal.
+DELIMITER = re.compile(r'[ \t\n\r{}\[\],:"]')
+# The number of characters read at once.
+CHUNK_SIZE = 65536
+
+
+class JSONStreamError(ValueError):
+    """Raised if the JSON is invalid."""
+
+    def __init__(self, message, lineno, colno):  # noqa: D107
+        super().__init__(f"{message}: line {lineno} column {colno}")
+        self.lineno = lineno
+        self.colno = colno
+
+
+# Expectations of the parser.
+VALUE = 1
+VALUE_OR_END = 2
+KEY = 3
+KEY_OR_END = 4
+COLON = 5
+COMMA_OR_END = 6
+DONE = 7
+
+
+def iterparse(stream):
+    """
+    Accept JSON as a text IO object, and yield ``(lineno, event, value)`` tuples, in document order.
+
+    The events are ``start_map``, ``map_key``, ``end_map``, ``start_array``, ``end_array``, ``string``, ``number``,
+    ``boolean`` and ``null``. Only the ``map_key`` and scalar events have values.
+
+    The stream is read in chunks of :data:`CHUNK_SIZE` characters, so memory use is bounded by the chunk size, the
+    longest string and the nesting depth, even if the JSON is on one line.
+
+    :raises JSONStreamError: if the JSON is invalid
+    """
+    stack = []
+    expect = VALUE
+
+    for lineno, position, kind, value in _tokenize(stream):
+        if kind is None:
+            if expect != DONE:
+                _error("Expecting value", lineno, position)
+            return
+
+        if expect in {VALUE, VALUE_OR_END}:
+            if kind == "]" and expect == VALUE_OR_END:
+                stack.pop()
+                yield lineno, "end_array", None
+            elif kind == "{":
+                stack.append(kind)
+                yield lineno, "start_map", None
+                expect = KEY_OR_END
+                continue
+            elif kind == "[":
+                stack.append(kind)
+                yield lineno, "start_array", None
+                expect = VALUE_OR_END
+                continue
+            elif kind not in PUNCTUATION:
+                yield lineno, kind, value
+            else:
+                _error("Expecting value", lineno, position)
+        elif expect in {KEY, KEY_OR_END}:
+            if kind == "string":
+                yield lineno, "map_key", value
+                expect = COLON
+                continue
+            if kind == "}" and expect == KEY_OR_END:
+                stack.pop()
+                yield lineno, "end_map", None
+            else:
+                _error("Expecting property name enclosed in double quotes", lineno, position)
+        elif expect == COLON:
+            if kind != ":":
+                _error("Expecting ':' delimiter", lineno, position)
+            expect = VALUE
+            continue
+        elif expect == COMMA_OR_END:
+            if kind == ",":
+                expect = KEY if stack[-1] == "{" else VALUE
+                continue
+            if (kind, stack[-1]) in {("}", "{"), ("]", "[")}:
+                stack.pop()
+                yield lineno, "end_map" if kind == "}" else "end_array", None
+            else:
+                _error("Expecting ',' delimiter", lineno, position)
+        else:
+            _error("Extra data", lineno, position)
+
+        # A value was completed.
+        expect = COMMA_OR_END if stack else DONE
+
+
+# Yield the line number, column offset, kind and value of each token, and then a token whose kind is `None`.
+#
+# A token that ends at the end of the buffer might continue in the next chunk. In that case, the consumed characters
+# are dropped from the buffer, and the next chunk is appended.
+def _tokenize(stream):
+    buffer = ""
+    position = 0
+    lineno = 1
+    # The buffer offset of the start of the current line, which is negative if the line started in a dropped chunk.
+    line_start = 0
+    last = "\n"
+    eof = incomplete = False
+
+    while True:
+        # Only whitespace can contain newlines, as strings can't contain unescaped control characters.
+        end = WHITESPACE.match(buffer, position).end()
+        newlines = buffer.count("\n", position, end)
+        if newlines:
+            lineno += newlines
+            line_start = buffer.rfind("\n", position, end) + 1
+        position = end
+
+        if incomplete or position == len(buffer):
+            if eof:
+                break
+            chunk = stream.read(CHUNK_SIZE)
+            if chunk:
+                buffer = buffer[position:] + chunk
+                line_start -= position
+                position = 0
+                last = chunk[-1]
+            else:
+                eof = True
+            incomplete = False
+            continue
+
+        char = buffer[position]
+        if char == '"':
+            if not eof and _string_end(buffer, position + 1) == -1:
+                incomplete = True
+                continue
+            value, next_position = scanstring(buffer, position + 1)
+            kind = "string"
+        elif char in PUNCTUATION:
+            next_position = position + 1
+            kind = char
+            value = None
+        else:
+            if not eof and not DELIMITER.search(buffer, position):
+                incomplete = True
+                continue
+            match = NUMBER.match(buffer, position)
+            if match:
+                number, fraction, exponent = match.group(), *match.groups()
+                next_position = match.end()
+                kind = "number"
+                value = float(number) if fraction or exponent else int(number)
+            else:
+                for literal, (kind, value) in LITERALS.items():  # noqa: B007
+                    if buffer.startswith(literal, position):
+                        next_position = position + len(literal)
+                        break
+                else:
+                    _error("Expecting value", lineno, position - line_start)
+
+        yield lineno, position - line_start, kind, value
+        position = next_position
+
+    # Like the line-by-line parser that this replaced, report the end of the input as the start of the next line.
+    yield lineno if last == "\n" else lineno + 1, 0, None, None
+
+
+# Return the index of the closing quote of the string that starts at the position, or -1 if not in the buffer.
+def _string_end(buffer, position):
+    while True:
+        end = buffer.find('"', position)
+        if end == -1:
+            return -1
+        backslash = end - 1
+        while buffer[backslash] == "\\":
+            backslash -= 1
+        # The quote is escaped if preceded by an odd number of backslashes.
+        if (end - backslash) % 2:
+            return end
+        position = end + 1
+
+
+def _error(message, lineno, position):
+    raise JSONStreamError(message, lineno, position + 1)
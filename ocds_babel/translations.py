@@ -0,0 +1,342 @@
+"""
+Message catalogs that can be used as the ``translator`` argument to translation methods.
+
+To share a message catalog between processes, instead of parsing it into a dictionary in each process, memory-map
+its MO file:
+
+.. code:: python
+
+    import gettext
+
+    from ocds_babel.translations import MappedTranslations
+
+    translator = gettext.translation('schema', localedir, languages=[language], class_=MappedTranslations)
+
+MO files, as written by ``msgfmt``, contain a table of messages sorted by ID, which is binary-searched on each lookup.
+The operating system's page cache holds one copy of the file for all processes. ``pybabel compile`` sorts messages by
+ID, then by context, which doesn't sort the table if any message has a context: in that case, the catalog indexes the
+message IDs in a dictionary, when the MO file is loaded.
+
+Messages are read from the MO file for the life of the catalog, so MO files must be replaced atomically, while they are
+mapped. ``msgfmt`` and ``pybabel compile`` rewrite the MO file in place, after which a lookup can crash the process
+(with ``SIGBUS``). Instead, compile to a temporary file in the same directory, and rename it with ``os.replace``. On
+Windows, a mapped MO file can't be replaced or deleted: call :meth:`~MappedTranslations.close` first.
+
+To translate into many languages in one process, load the message catalogs of a domain into one table, which stores
+each message ID once, instead of once per language:
+
+.. code:: python
+
+    from ocds_babel.translations import MultilingualCatalog
+
+    catalog = MultilingualCatalog('schema', localedir, ['es', 'fr', 'it'])
+    for language in catalog.translations:
+        translate_schema_data(data, catalog.translator(language), lang=language)
+
+To look up each message once, across many files, and to replace ``{{marker}}`` markers once per message, use a
+translation memo:
+
+.. code:: python
+
+    from ocds_babel.translate import translate_schema_data
+    from ocds_babel.translations import TranslationMemo
+
+    memo = TranslationMemo()
+    translator = memo.bind(translator, 'schema', language, version='1.1')
+    for data in schemas:
+        translate_schema_data(data, translator)
+    print(memo.hits, memo.misses)
+
+:code:`translate` uses a translation memo for all the files it translates.
+"""
+
+import errno
+import gettext
+import mmap
+from struct import unpack, unpack_from
+
+from ocds_babel.util import replacer
+
+
+class MappedTranslations(gettext.NullTranslations):
+    """
+    A message catalog that looks up messages in a memory-mapped MO file.
+
+    Only the :meth:`gettext` and :meth:`pgettext` methods use the catalog.
+    """
+
+    LE_MAGIC = gettext.GNUTranslations.LE_MAGIC
+    BE_MAGIC = gettext.GNUTranslations.BE_MAGIC
+
+    # A catalog without a file has no messages.
+    _buffer = None
+    _count = 0
+    # A dict of message IDs to indices, if the MO file's table of messages isn't sorted.
+    _index = None
+
+    def _parse(self, fp):
+        filename = getattr(fp, "name", "")
+
+        self._buffer = buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = unpack("<I", buf[:4])[0]
+        if magic == self.LE_MAGIC:
+            self._format = "<II"
+            version, self._count, self._masteridx, self._transidx = unpack("<4I", buf[4:20])
+        elif magic == self.BE_MAGIC:
+            self._format = ">II"
+            version, self._count, self._masteridx, self._transidx = unpack(">4I", buf[4:20])
+        else:
+            buf.close()
+            raise OSError(0, "Bad magic number", filename)
+
+        if version >> 16 not in gettext.GNUTranslations.VERSIONS:
+            buf.close()
+            raise OSError(0, f"Bad version number {version >> 16}", filename)
+
+        if not self._is_sorted():
+            self._index = {self._get(self._masteridx, index): index for index in range(self._count)}
+
+        index = self._find(b"")
+        if index is not None:
+            self._parse_description(self._get(self._transidx, index).decode())
+
+    def _is_sorted(self):
+        previous = b""
+        for index in range(self._count):
+            key = self._get(self._masteridx, index)
+            if key < previous:
+                return False
+            previous = key
+        return True
+
+    def _parse_description(self, description):
+        last_key = None
+        for line in description.split("\n"):
+            item = line.strip()
+            if not item:
+                continue
+            if ":" in item:
+                key, value = item.split(":", 1)
+                last_key = key.strip().lower()
+                self._info[last_key] = value.strip()
+                if last_key == "content-type" and "charset=" in value:
+                    self._charset = value.split("charset=")[1].strip()
+            elif last_key:
+                self._info[last_key] += "\n" + item
+
+    def _get(self, table, index):
+        length, offset = unpack_from(self._format, self._buffer, table + index * 8)
+        return self._buffer[offset : offset + length]
+
+    def _find(self, key):
+        if self._index is not None:
+            return self._index.get(key)
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self._get(self._masteridx, middle)
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def _lookup(self, message):
+        charset = self._charset or "ascii"
+        try:
+            key = message.encode(charset)
+        except UnicodeEncodeError:
+            return None
+
+        index = self._find(key)
+        if index is None:
+            return None
+        return self._get(self._transidx, index).decode(charset)
+
+    def _items(self):
+        # Like `gettext.GNUTranslations`, decode message IDs and translations with the catalog's charset.
+        charset = self._charset or "ascii"
+        for index in range(self._count):
+            msgid = self._get(self._masteridx, index)
+            # Plural forms are only used by `ngettext`.
+            if b"\0" not in msgid:
+                yield msgid.decode(charset), self._get(self._transidx, index).decode(charset)
+
+    def gettext(self, message):
+        """Return the translation of the message, if any."""
+        translation = self._lookup(message)
+        if translation is not None:
+            return translation
+        if self._fallback:
+            return self._fallback.gettext(message)
+        return message
+
+    def pgettext(self, context, message):
+        """Return the translation of the message in the context, if any."""
+        translation = self._lookup(f"{context}\x04{message}")
+        if translation is not None:
+            return translation
+        if self._fallback:
+            return self._fallback.pgettext(context, message)
+        return message
+
+    def close(self):
+        """Unmap the MO file, and those of any fallback catalogs. The catalog can't be used afterwards."""
+        if self._buffer is not None:
+            self._buffer.close()
+        if isinstance(self._fallback, MappedTranslations):
+            self._fallback.close()
+
+
+class MultilingualCatalog:
+    """
+    The message catalogs of one domain in many languages, which store each message ID once.
+
+    Each message ID has an index, and each language's translations are a list in the same order. Fallbacks are
+    resolved when the catalog is loaded, so that each lookup is one dictionary lookup and one list access.
+
+    :param domain: the gettext domain
+    :param localedir: the path of the directory containing message catalog files
+    :param languages: the codes of the languages to load
+    :param fallbacks: a dict of language codes to lists of language codes, whose catalogs are consulted, in order, if
+        a message has no translation in the language's catalog, e.g. :code:`{'es_MX': ['es']}`
+    :raises FileNotFoundError: if a language's MO file is not found
+    """
+
+    def __init__(self, domain, localedir, languages, fallbacks=None):  # noqa: D107
+        #: The message IDs, in order of index
+        self.msgids = []
+        #: A dict of message IDs to indices
+        self.index = {}
+        #: A dict of language codes to lists of translations, in order of index, with ``None`` if untranslated
+        self.translations = {}
+
+        fallbacks = fallbacks or {}
+        # The fallback languages must be loaded, too.
+        languages = list(dict.fromkeys([*languages, *(code for codes in fallbacks.values() for code in codes)]))
+
+        catalogs = {}
+        for language in languages:
+            path = gettext.find(domain, localedir, languages=[language])
+            if path is None:
+                raise FileNotFoundError(errno.ENOENT, "No translation file found for domain", domain)
+            with open(path, "rb") as f:
+                mapped = MappedTranslations(f)
+            try:
+                catalog = catalogs[language] = {}
+                for msgid, msgstr in mapped._items():  # noqa: SLF001
+                    index = self.index.get(msgid)
+                    if index is None:
+                        index = self.index[msgid] = len(self.msgids)
+                        self.msgids.append(msgid)
+                    # Re-use the message ID's string, if the message isn't translated.
+                    catalog[index] = self.msgids[index] if msgstr == msgid else msgstr
+            finally:
+                mapped.close()
+
+        for language in languages:
+            translations = [None] * len(self.index)
+            for code in reversed([language, *fallbacks.get(language, ())]):
+                for index, msgstr in catalogs[code].items():
+                    translations[index] = msgstr
+            self.translations[language] = translations
+
+    def translator(self, language):
+        """Return a translator for the language, which can be used as the ``translator`` argument."""
+        return MultilingualTranslator(self.index, self.translations[language])
+
+
+class MultilingualTranslator(gettext.NullTranslations):
+    """
+    A translator returned by :meth:`MultilingualCatalog.translator`.
+
+    Only the :meth:`gettext` and :meth:`pgettext` methods use the catalog.
+    """
+
+    def __init__(self, index, translations):  # noqa: D107
+        super().__init__()
+        self._index = index
+        self._translations = translations
+
+    def _lookup(self, message):
+        index = self._index.get(message)
+        if index is None:
+            return None
+        return self._translations[index]
+
+    def gettext(self, message):
+        """Return the translation of the message, if any."""
+        translation = self._lookup(message)
+        if translation is None:
+            return message
+        return translation
+
+    def pgettext(self, context, message):
+        """Return the translation of the message in the context, if any."""
+        translation = self._lookup(f"{context}\x04{message}")
+        if translation is None:
+            return message
+        return translation
+
+
+class TranslationMemo:
+    """A cache of translated messages, with ``{{marker}}`` markers replaced, that counts hits and misses."""
+
+    def __init__(self):  # noqa: D107
+        self.cache = {}
+        self.untranslated_messages = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bind(self, translator, domain, language, **kwargs):
+        """
+        Return a translator that caches the translator's messages, replacing markers with keyword argument values.
+
+        Pass the returned translator to translation methods without keyword arguments, as markers are already replaced.
+        """
+        return MemoTranslator(
+            self,
+            translator,
+            self.cache.setdefault((domain, language, *sorted(kwargs.items())), {}),
+            self.untranslated_messages.setdefault((domain, language), set()),
+            kwargs,
+        )
+
+
+class MemoTranslator:
+    """
+    A translator returned by :meth:`TranslationMemo.bind`.
+
+    The ``lookups`` attribute counts the messages looked up with this translator, and the ``untranslated`` attribute
+    counts those whose translation is the message itself.
+    """
+
+    def __init__(self, memo, translator, cache, untranslated_messages, kwargs):  # noqa: D107
+        self.memo = memo
+        self.translator = translator
+        self.cache = cache
+        self.untranslated_messages = untranslated_messages
+        self.replace = replacer(kwargs)
+        self.lookups = 0
+        self.untranslated = 0
+
+    def gettext(self, message):
+        """Return the translation of the message, with markers replaced."""
+        self.lookups += 1
+        try:
+            translation = self.cache[message]
+        except KeyError:
+            self.memo.misses += 1
+            original = self.translator.gettext(message)
+            if original == message:
+                self.untranslated_messages.add(message)
+            translation = self.cache[message] = self.replace(original)
+        else:
+            self.memo.hits += 1
+        if message in self.untranslated_messages:
+            self.untranslated += 1
+        return translation
@@ -1,4 +1,260 @@
+import contextlib
+import io
+import json
+import math
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# To search for numbers with substrings, instead of slower regular expressions, all digits are replaced with "0".
+# Strings can match, too, in which case the standard library is used, unnecessarily.
+DIGITS = bytes.maketrans(b"123456789", b"000000000")
+# orjson parses integers outside the 64-bit range as floats.
+ORJSON_LOADS_INEXACT = b"0" * 19
+# orjson serializes some floats differently (e.g. 1e+16 as 1e16, and 1e-05 as 0.00001).
+ORJSON_DUMPS_INEXACT = (b"0e0", b"0e-", b"0.0000")
+# orjson serializes NaN and Infinity as null.
+ORJSON_DUMPS_NULL = (b" null,", b" null\n")
+
+JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+# The approximate number of characters written at once by `json_dump`.
+JSON_CHUNK_SIZE = 65536
+
+
 def text_to_translate(value, condition=True):  # noqa: FBT002
     if condition and isinstance(value, str):
         return value.strip()
     return None
+
+
+def walk(data, keys):
+    """
+    Yield the container, key and path of each object member with one of the keys in the data, in document order.
+
+    The path is a :class:`Path` to the container. To build a JSON Pointer to the value, use :func:`pointer`.
+
+    The data is walked with an explicit stack, so deeply nested data does not reach the recursion limit.
+    """
+    if not isinstance(data, (dict, list)):
+        return
+
+    stack = [_frame(data, Path())]
+    while stack:
+        container, path, is_dict, items = stack[-1]
+        for key, value in items:
+            if is_dict and key in keys:
+                yield container, key, path
+            if isinstance(value, (dict, list)):
+                stack.append(_frame(value, Path(path, key)))
+                break
+        else:
+            stack.pop()
+
+
+def _frame(container, path):
+    if isinstance(container, dict):
+        return container, path, True, iter(container.items())
+    return container, path, False, enumerate(container)
+
+
+class Path:
+    """The object keys and array indices from the root of the data to a container, from :func:`walk`."""
+
+    __slots__ = ("_pointer", "key", "parent")
+
+    def __init__(self, parent=None, key=None):  # noqa: D107
+        self.parent = parent
+        self.key = key
+        # The JSON Pointer is built on demand, and reused by descendants.
+        self._pointer = None if parent else ""
+
+    def keys(self):
+        """Return the object keys and array indices, as a list."""
+        keys = []
+        path = self
+        while path.parent:
+            keys.append(path.key)
+            path = path.parent
+        keys.reverse()
+        return keys
+
+    def pointer(self):
+        """Return the JSON Pointer to the container."""
+        unbuilt = []
+        path = self
+        while path._pointer is None:
+            unbuilt.append(path)
+            path = path.parent
+        for child in reversed(unbuilt):
+            child._pointer = f"{child.parent._pointer}/{child.key}"  # noqa: SLF001
+        return self._pointer
+
+
+def pointer(path, key):
+    """Return the JSON Pointer to the key of the container at the path, from :func:`walk`."""
+    return f"{path.pointer()}/{key}"
+
+
+def translatable(data, keys):
+    """
+    Yield the container, key, path and text to translate of each string value of the specified keys.
+
+    If ``keys`` is ``None`` (the default of ``keys`` arguments for YAML files), no values are yielded.
+    """
+    for container, key, path in walk(data, keys or ()):
+        text = text_to_translate(container[key])
+        if text:
+            yield container, key, path, text
+
+
+def translatable_locations(data, keys):
+    """Return the container, key and text to translate of each string value of the specified keys."""
+    return [(container, key, text) for container, key, _, text in translatable(data, keys)]
+
+
+def translatable_paths(data, keys):
+    """Return the path of each string value of the specified keys, as a list of object keys and array indices."""
+    return [[*path.keys(), key] for _, key, path, _ in translatable(data, keys)]
+
+
+def copy_paths(data, paths):
+    """Return a copy of the data, in which only the objects and arrays on the paths are copied."""
+    data = data.copy()
+    copies = {id(data)}
+    for path in paths:
+        container = data
+        for key in path[:-1]:
+            child = container[key]
+            if id(child) not in copies:
+                child = container[key] = child.copy()
+                copies.add(id(child))
+            container = child
+    return data
+
+
+def locations_from_paths(data, paths):
+    """Return the container, key and text to translate of each path, like :func:`translatable_locations`."""
+    locations = []
+    for path in paths:
+        container = data
+        for key in path[:-1]:
+            container = container[key]
+        text = text_to_translate(container[path[-1]])
+        if text:
+            locations.append((container, path[-1], text))
+    return locations
+
+
+def translate_locations(locations, translator, **kwargs):
+    """Set each location to its translated text, replacing ``{{marker}}`` markers with keyword argument values."""
+    replace = replacer(kwargs)
+    for container, key, text in locations:
+        container[key] = replace(translator.gettext(text))
+
+
+def replacer(kwargs):
+    """Return a function that replaces all ``{{marker}}`` markers with keyword argument values, in one pass."""
+    if not kwargs:
+        return _identity
+
+    replacements = {"{{" + old + "}}": new for old, new in kwargs.items()}
+    pattern = re.compile("|".join(map(re.escape, replacements)))
+
+    def replace(text):
+        if "{{" not in text:
+            return text
+        return pattern.sub(lambda match: replacements[match.group()], text)
+
+    return replace
+
+
+def _identity(text):
+    return text
+
+
+@contextlib.contextmanager
+def text_stream(fileobj, newline=None):
+    """Wrap a binary IO object as a text IO object, without closing the binary IO object on exit."""
+    stream = io.TextIOWrapper(fileobj, encoding="utf-8", newline=newline)
+    try:
+        yield stream
+    finally:
+        stream.detach()
+
+
+def json_backend():
+    """Return ``"orjson"`` if JSON is parsed and serialized with orjson, or ``"json"`` otherwise."""
+    return "json" if orjson is None else "orjson"
+
+
+def json_loads(text):
+    """
+    Parse JSON as a string or bytes, like ``json.loads``.
+
+    If orjson is installed, it is used, unless its result might differ from the standard library's.
+    """
+    if orjson is not None:
+        try:
+            data = text.encode() if isinstance(text, str) else bytes(text)
+            if ORJSON_LOADS_INEXACT not in data.translate(DIGITS):
+                return orjson.loads(data)
+        except (UnicodeEncodeError, orjson.JSONDecodeError):
+            pass
+    return json.loads(text)
+
+
+def json_dumps(data):
+    """
+    Serialize data as JSON, like ``json.dumps(data, ensure_ascii=False, indent=2)``.
+
+    If orjson is installed, it is used, unless its output might differ from the standard library's.
+    """
+    if orjson is not None:
+        try:
+            output = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            digits = output.translate(DIGITS)
+            if not any(substring in digits for substring in ORJSON_DUMPS_INEXACT) and not (
+                (output == b"null" or any(substring in output for substring in ORJSON_DUMPS_NULL))
+                and _has_nonfinite_float(data)
+            ):
+                return output.decode()
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def json_dump(data, io):
+    """
+    Serialize data as JSON to a text IO object, like ``json.dump(data, io, ensure_ascii=False, indent=2)``.
+
+    Unlike :func:`json_dumps`, the output is written in chunks, instead of being serialized in memory, so orjson isn't
+    used.
+    """
+    chunks = []
+    size = 0
+    # The encoder yields many small strings, which are joined, to write fewer and larger chunks.
+    for chunk in JSON_ENCODER.iterencode(data):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= JSON_CHUNK_SIZE:
+            io.write("".join(chunks))
+            chunks.clear()
+            size = 0
+    io.write("".join(chunks))
+
+
+def _has_nonfinite_float(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            return True
+    return False
@@ -0,0 +1,18 @@
+import os
+
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo as babel_write_mo
+
+
+def write_mo(localedir, language, domain, messages):
+    """Write a GNU MO file with Babel, like ``pybabel compile``. Keys are message IDs, or ``context\\x04id``."""
+    directory = os.path.join(localedir, language, "LC_MESSAGES")
+    os.makedirs(directory, exist_ok=True)
+
+    catalog = Catalog()
+    for key, string in messages.items():
+        context, _, msgid = key.rpartition("\x04")
+        catalog.add(msgid, string, context=context or None)
+
+    with open(os.path.join(directory, f"{domain}.mo"), "wb") as f:
+        babel_write_mo(f, catalog)
@@ -0,0 +1,25 @@
+from tempfile import TemporaryDirectory
+
+from benchmarks.__main__ import compare, measure
+from benchmarks.corpus import Corpus
+from benchmarks.suite import collect
+
+
+def test_benchmarks():
+    with TemporaryDirectory() as directory:
+        sources = Corpus(size=3, depth=2).write(directory, ("es", "fr"))
+        benchmarks = collect(sources, f"{directory}/locale", ("es", "fr"), f"{directory}/build")
+
+        results = {name: measure(function, 1) for name, function in benchmarks.items()}
+
+    assert "[es] " in benchmarks["translate_codelist"]()
+    assert set(results) >= {"extract_schema", "translate_schema", "translate"}
+    assert all(0 < result["min"] <= result["median"] for result in results.values())
+
+
+def test_compare(capsys):
+    baseline = {"fast": {"min": 1.0}, "slow": {"min": 1.0}}
+    results = {"fast": {"min": 0.5}, "slow": {"min": 1.5}, "new": {"min": 1.0}}
+
+    assert compare(baseline, results, 0.1) == ["slow"]
+    assert "new" in capsys.readouterr().out
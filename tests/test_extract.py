@@ -1,7 +1,16 @@
+import json
 import os
 from tempfile import TemporaryDirectory
 
-from ocds_babel.extract import extract_codelist, extract_extension_metadata, extract_schema, extract_yaml
+import pytest
+
+from ocds_babel.extract import (
+    extract_codelist,
+    extract_extension_metadata,
+    extract_schema,
+    extract_unique,
+    extract_yaml,
+)
 
 options = {
     "headers": "Title,Description,Extension",
@@ -90,6 +99,23 @@ def test_extract_codelist_newline():
     )
 
 
+def test_extract_codelist_multibyte():
+    # Multibyte characters span the boundaries of the chunks that are decoded.
+    rows = [f"{i},{'é' * (i % 7)}ñ\r\n" for i in range(10000)]
+
+    assert_result(
+        "test.csv",
+        "".join(["Code,Title\r\n", *rows]).encode(),
+        extract_codelist,
+        {"headers": "Title"},
+        [
+            (0, "", "Code", ""),
+            (0, "", "Title", ""),
+            *((i + 1, "", f"{'é' * (i % 7)}ñ", ["Title"]) for i in range(10000)),
+        ],
+    )
+
+
 def test_extract_schema():
     schema = b"""{
         "title": {
@@ -202,3 +228,147 @@ def test_extract_yaml_obj():
             (1, "", "bzz", ["/baz"]),
         ],
     )
+
+
+def test_extract_schema_stream():
+    schema = b"""{
+        "title": {
+            "oneOf": [{
+                "title": "  foo  ",
+                "description": "  bar  "
+            }, {
+                "title": "  baz  ", "description": "  bzz  "
+            }, 1, [true, null]]
+        },
+        "description": {
+            "title": "  zzz  ",
+            "description": "    "
+        }
+    }"""
+
+    assert_result(
+        "schema.json",
+        schema,
+        extract_schema,
+        {"stream": "true"},
+        [
+            (4, "", "foo", ["/title/oneOf/0/title"]),
+            (5, "", "bar", ["/title/oneOf/0/description"]),
+            (7, "", "baz", ["/title/oneOf/1/title"]),
+            (7, "", "bzz", ["/title/oneOf/1/description"]),
+            (11, "", "zzz", ["/description/title"]),
+        ],
+    )
+
+
+def test_extract_unique():
+    schema = (
+        b'{"title": "Title", "properties": {"a": {"title": "Title", "description": "A"}}, "items": [{"title": "A"}]}'
+    )
+
+    with TemporaryDirectory() as d:
+        filenames = [os.path.join(d, "a.json"), os.path.join(d, "b.json")]
+        for filename in filenames:
+            with open(filename, "wb") as f:
+                f.write(schema)
+
+        messages = extract_unique(filenames, extract_schema)
+
+        assert list(messages) == ["Title", "A"]
+        assert messages["Title"].text == "Title"
+        assert [
+            (occurrence.filename, occurrence.lineno, occurrence.comment)
+            for occurrence in messages["Title"].occurrences
+        ] == [
+            (filenames[0], 1, "/title"),
+            (filenames[0], 1, "/properties/a/title"),
+            (filenames[1], 1, "/title"),
+            (filenames[1], 1, "/properties/a/title"),
+        ]
+
+        # The same messages and comments as the extractor.
+        with open(filenames[0], "rb") as f:
+            expected = [
+                (lineno, text, comments[0]) for lineno, _, text, comments in extract_schema(f, None, None, None)
+            ]
+        assert sorted(
+            (occurrence.lineno, message.text, occurrence.comment)
+            for message in messages.values()
+            for occurrence in message.occurrences
+            if occurrence.filename == filenames[0]
+        ) == sorted(expected)
+
+        # Options are passed to the extractor.
+        messages = extract_unique(filenames, extract_schema, {"stream": "true"})
+
+        assert [occurrence.comment for occurrence in messages["A"].occurrences] == [
+            "/properties/a/description",
+            "/items/0/title",
+        ] * 2
+
+
+def test_extract_unique_codelist():
+    with TemporaryDirectory() as d:
+        filename = os.path.join(d, "test.csv")
+        with open(filename, "wb") as f:
+            f.write(codelist)
+
+        messages = extract_unique([filename], extract_codelist, options)
+
+        assert [(occurrence.lineno, occurrence.comment) for occurrence in messages["Title"].occurrences] == [(0, None)]
+        assert [(occurrence.lineno, occurrence.comment) for occurrence in messages["bzz"].occurrences] == [
+            (1, "Extension"),
+            (2, "Description"),
+            (3, "Title"),
+        ]
+
+
+def test_extract_cache(monkeypatch):
+    with TemporaryDirectory() as d:
+        cache_dir = os.path.join(d, "cache")
+        cache_options = {**options, "cache_dir": cache_dir}
+        filename = os.path.join(d, "test.csv")
+        with open(filename, "wb") as f:
+            f.write(codelist)
+
+        with open(filename, "rb") as f:
+            expected = list(extract_codelist(f, None, None, options))
+        with open(filename, "rb") as f:
+            assert extract_codelist(f, None, None, cache_options) == expected
+
+        def fail(fileobj, options):
+            raise AssertionError
+
+        # Unchanged files are read from the cache.
+        monkeypatch.setattr("ocds_babel.extract._codelist_messages", fail)
+        with open(filename, "rb") as f:
+            assert extract_codelist(f, None, None, cache_options) == expected
+
+        # Other options are part of the key.
+        with open(filename, "rb") as f, pytest.raises(AssertionError):
+            extract_codelist(f, None, None, {**cache_options, "headers": "Title"})
+
+        # The content is part of the key.
+        with open(filename, "ab") as f:
+            f.write(b"foo,bar,baz,bzz,zzz\n")
+        with open(filename, "rb") as f, pytest.raises(AssertionError):
+            extract_codelist(f, None, None, cache_options)
+
+
+def test_extract_cache_eviction():
+    with TemporaryDirectory() as d:
+        cache_dir = os.path.join(d, "cache")
+        for i in range(5):
+            filename = os.path.join(d, f"{i}.json")
+            with open(filename, "w") as f:
+                json.dump({"title": "x" * 1000, "description": str(i)}, f)
+            with open(filename, "rb") as f:
+                assert list(extract_schema(f, None, None, {"cache_dir": cache_dir, "cache_size": "0.003"})) == [
+                    (1, "", "x" * 1000, ["/title"]),
+                    (1, "", str(i), ["/description"]),
+                ]
+
+        sizes = [entry.stat().st_size for directory in os.scandir(cache_dir) for entry in os.scandir(directory)]
+
+        assert 1 < len(sizes) < 5
+        assert sum(sizes) <= 0.003 * 1024 * 1024
@@ -0,0 +1,65 @@
+import os
+from tempfile import TemporaryDirectory
+
+import pytest
+from babel.messages.frontend import CommandLineInterface
+
+from ocds_babel.extract_project import extract_project
+
+CONFIGURATION = """\
+[extractors]
+ocds_codelist = ocds_babel.extract:extract_codelist
+ocds_schema = ocds_babel.extract:extract_schema
+[ocds_codelist: **/codelists/*.csv]
+headers = Title,Description
+ignore = currency.csv
+[ocds_schema: **-schema.json]
+"""
+
+FILES = {
+    "release-schema.json": '{"title": "Release", "properties": {"tag": {"title": "Tag", "description": "Release"}}}',
+    "sub/record-schema.json": '{"title": "Record", "description": "Release"}',
+    ".hidden/hidden-schema.json": '{"title": "Hidden"}',
+    "_private/private-schema.json": '{"title": "Private"}',
+    "codelists/method.csv": "Code,Title,Description\nopen,Open,Open to all\nlimited,Limited,\n",
+    "codelists/currency.csv": "Code,Title\nUSD,US Dollar\n",
+    "README.md": "# Ignored\n",
+}
+
+
+def read_without_creation_date(path):
+    with open(path) as f:
+        return "".join(line for line in f if not line.startswith('"POT-Creation-Date:'))
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_extract_project(monkeypatch, jobs):
+    with TemporaryDirectory() as directory:
+        monkeypatch.chdir(directory)
+
+        for name, content in FILES.items():
+            os.makedirs(os.path.join("schema", os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join("schema", name), "w") as f:
+                f.write(content)
+        with open("babel.cfg", "w") as f:
+            f.write(CONFIGURATION)
+
+        CommandLineInterface().run(["pybabel", "-q", "extract", "-F", "babel.cfg", "-o", "expected.pot", "schema"])
+        catalog = extract_project("babel.cfg", ["schema"], "actual.pot", jobs=jobs)
+
+        assert read_without_creation_date("actual.pot") == read_without_creation_date("expected.pot")
+        assert [message.id for message in catalog if message.id] == [
+            "Release",
+            "Tag",
+            "Code",
+            "Title",
+            "Description",
+            "Open",
+            "Open to all",
+            "Limited",
+            "Record",
+        ]
+        assert catalog["Release"].locations == [
+            ("schema/release-schema.json", 1),
+            ("schema/sub/record-schema.json", 1),
+        ]
@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+
+from ocds_babel import jsonstream
+from ocds_babel.jsonstream import JSONStreamError, iterparse
+
+DATA = '{"a": [1, 2.5, -3e2, true, false, null, "x\\"y\\u00e9"],\n "b": {}, "c": []}'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 65536])
+def test_iterparse(monkeypatch, chunk_size):
+    monkeypatch.setattr(jsonstream, "CHUNK_SIZE", chunk_size)
+
+    assert list(iterparse(StringIO(DATA))) == [
+        (1, "start_map", None),
+        (1, "map_key", "a"),
+        (1, "start_array", None),
+        (1, "number", 1),
+        (1, "number", 2.5),
+        (1, "number", -300.0),
+        (1, "boolean", True),
+        (1, "boolean", False),
+        (1, "null", None),
+        (1, "string", 'x"yé'),
+        (1, "end_array", None),
+        (2, "map_key", "b"),
+        (2, "start_map", None),
+        (2, "end_map", None),
+        (2, "map_key", "c"),
+        (2, "start_array", None),
+        (2, "end_array", None),
+        (2, "end_map", None),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        ("", "Expecting value: line 1 column 1"),
+        ("[", "Expecting value: line 2 column 1"),
+        ("[1,]", "Expecting value: line 1 column 4"),
+        ("[1 2]", "Expecting ',' delimiter: line 1 column 4"),
+        ('{"a"}', "Expecting ':' delimiter: line 1 column 5"),
+        ('{"a": 1,}', "Expecting property name enclosed in double quotes: line 1 column 9"),
+        ('{"a": 1]', "Expecting ',' delimiter: line 1 column 8"),
+        ("1\n2", "Extra data: line 2 column 1"),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 65536])
+def test_iterparse_invalid(monkeypatch, data, message, chunk_size):
+    monkeypatch.setattr(jsonstream, "CHUNK_SIZE", chunk_size)
+
+    with pytest.raises(JSONStreamError, match=f"^{message}$"):
+        list(iterparse(StringIO(data)))
+
+
+def test_iterparse_one_line(monkeypatch):
+    monkeypatch.setattr(jsonstream, "CHUNK_SIZE", 16)
+
+    class Stream(StringIO):
+        def read(self, size=-1):
+            # The stream is read in chunks, not in lines.
+            assert size == 16
+            return super().read(size)
+
+    data = '{"a": "' + "\\\\" * 10 + '", "b": [' + ", ".join(['"\\"x"'] * 100) + "]}"
+
+    assert [value for _, event, value in iterparse(Stream(data)) if event == "string"] == [
+        "\\" * 10,
+        *['"x'] * 100,
+    ]
@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+
+from ocds_babel.service import TranslationService
+from ocds_babel.translations import MappedTranslations
+from tests import write_mo
+
+
+def test_translate_schema_data():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", {"Release {{version}} [{{lang}}]": "Entrega {{version}} [{{lang}}]"})
+
+        service = TranslationService(localedir)
+        source = {"title": "Release {{version}} [{{lang}}]", "items": [{"description": "Untranslated"}]}
+
+        data = service.translate_schema_data(source, "schema", "es", version="1.1")
+
+        assert data == {"title": "Entrega 1.1 [es]", "items": [{"description": "Untranslated"}]}
+        assert source["title"] == "Release {{version}} [{{lang}}]"
+        assert (service.hits, service.misses) == (0, 1)
+
+        # Equal documents are served from the cache.
+        assert service.translate_schema_data(dict(source), "schema", "es", version="1.1") is data
+        assert (service.hits, service.misses) == (1, 1)
+
+        # Keyword arguments are part of the key.
+        assert service.translate_schema_data(source, "schema", "es", version="1.2")["title"] == "Entrega 1.2 [es]"
+        assert (service.hits, service.misses) == (1, 2)
+
+        # Catalogs are loaded once.
+        assert service.translator("schema", "es") is service.translator("schema", "es")
+
+
+def test_reload():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "codelists", {"Open": "Abierta"})
+
+        service = TranslationService(localedir, class_=MappedTranslations)
+        rows = [{"Code": "open", "Title": "Open"}]
+
+        assert service.translate_codelist_data(rows, "codelists", "es", ["Title"]) == [
+            {"Code": "open", "Title": "Abierta"}
+        ]
+
+        translator = service.translator("codelists", "es")
+        write_mo(localedir, "es", "codelists", {"Open": "Abierto", "Title": "Título"})
+        path = os.path.join(localedir, "es", "LC_MESSAGES", "codelists.mo")
+        # Make sure the modification time changes, whatever the file system's resolution.
+        os.utime(path, ns=(0, 0))
+
+        assert service.translate_codelist_data(rows, "codelists", "es", ["Title"]) == [
+            {"Code": "open", "Título": "Abierto"}
+        ]
+        assert service.translator("codelists", "es") is not translator
+        assert isinstance(service.translator("codelists", "es"), MappedTranslations)
+        assert (service.hits, service.misses) == (0, 2)
+
+        # The previous catalog maps a copy of the MO file, which was rewritten in place.
+        assert translator.gettext("Open") == "Abierta"
+
+
+def test_reload_replaced():
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as otherdir:
+        write_mo(localedir, "es", "codelists", {"Open": "Abierta"})
+        write_mo(otherdir, "es", "codelists", {"Open": "Abierto"})
+
+        service = TranslationService(localedir, class_=MappedTranslations)
+        rows = [{"Code": "open", "Title": "Open"}]
+
+        assert service.translate_codelist_data(rows, "codelists", "es", ["Title"])[0]["Title"] == "Abierta"
+
+        # Replace the MO file atomically, with a file of the same size and modification time.
+        path = os.path.join(localedir, "es", "LC_MESSAGES", "codelists.mo")
+        replacement = os.path.join(otherdir, "es", "LC_MESSAGES", "codelists.mo")
+        stat = os.stat(path)
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, path)
+
+        assert service.translate_codelist_data(rows, "codelists", "es", ["Title"])[0]["Title"] == "Abierto"
+
+
+def test_eviction():
+    with TemporaryDirectory() as localedir:
+        service = TranslationService(localedir, cache_size=2)
+
+        for title in ("a", "b", "a", "c", "b"):
+            service.translate_schema_data({"title": title}, "schema", "en")
+
+        # "b" is evicted when "c" is added, as "a" was used more recently.
+        assert (service.hits, service.misses) == (1, 4)
+        assert len(service._cache) == 2  # noqa: SLF001
+
+
+def test_other_methods():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "docs", {"Open": "Abierta", "Release {{version}}": "Entrega {{version}}"})
+
+        service = TranslationService(localedir)
+
+        assert service.translate_markdown_data("README.md", "# Open\n", "docs", "es") == "# Abierta\n"
+        assert service.translate_extension_metadata_data({"name": "Open"}, "docs", "es") == {"name": {"es": "Abierta"}}
+        assert service.translate_yaml_data(
+            [{"title": "Release {{version}}", "id": "Open"}], "docs", "es", keys=["title"], version="1.1"
+        ) == [{"title": "Entrega 1.1", "id": "Open"}]
+
+
+def test_key_types():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "docs", {"A": "a"})
+
+        service = TranslationService(localedir)
+
+        assert service.translate_yaml_data({1: {"title": "A"}}, "docs", "es", keys=["title"]) == {1: {"title": "a"}}
+        assert service.translate_yaml_data({"1": {"title": "A"}}, "docs", "es", keys=["title"]) == {
+            "1": {"title": "a"}
+        }
+        assert (service.hits, service.misses) == (0, 2)
+
+
+def test_threads():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", {"Open": "Abierta"})
+
+        service = TranslationService(localedir, cache_size=4)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(
+                executor.map(
+                    lambda i: service.translate_schema_data(
+                        {"title": "Open", "description": str(i % 8)}, "schema", "es"
+                    ),
+                    range(200),
+                )
+            )
+
+        assert results == [{"title": "Abierta", "description": str(i % 8)} for i in range(200)]
+        assert service.hits + service.misses == 200
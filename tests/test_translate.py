@@ -3,13 +3,36 @@ import gettext
 import json
 import logging
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
+from io import StringIO
 from tempfile import TemporaryDirectory
 from textwrap import dedent
 
+import pytest
 import yaml
-
-from ocds_babel.translate import translate
+from markdown_it import MarkdownIt
+from mdformat.renderer import MDRenderer, RenderTreeNode
+
+from ocds_babel.translate import (
+    UMASK,
+    _write_if_changed,
+    compile_schema_plan,
+    translate,
+    translate_codelist,
+    translate_codelist_data_iter,
+    translate_codelist_stream,
+    translate_languages,
+    translate_schema,
+    translate_schema_data,
+    translate_schema_plan,
+    translate_schema_stream,
+)
+from ocds_babel.translate_markdown import translate_markdown_data
+from ocds_babel.translate_yaml import _yaml_dump, _yaml_load, translate_yaml_data, yaml_backend
+from tests import write_mo
 
 headers = ["Title", "Description", "Extension"]
 
@@ -550,3 +573,550 @@ def test_translate_yaml(monkeypatch, caplog):
     assert len(caplog.records) == 1
     assert caplog.records[0].levelname == "INFO"
     assert caplog.records[0].message == f'Translating to es using "mappings" domain, into {builddir}'
+
+
+def test_translate_yaml_data_without_keys():
+    class Translation:
+        def gettext(self, message):
+            return message.upper()
+
+    data = [{"title": "Open", "mapping": ["Release"]}]
+
+    # Without keys, nothing is translated, instead of every string.
+    assert translate_yaml_data(data, Translation(), None) == data
+    assert translate_yaml_data(data, Translation(), ["mapping"]) == data
+    assert translate_yaml_data(data, Translation(), ["title"]) == [{"title": "OPEN", "mapping": ["Release"]}]
+
+
+def test_translate_yaml_backend():
+    assert yaml_backend() == ("libyaml" if yaml.__with_libyaml__ else "python")
+
+    text = "- title: 'yes'\n  description: \"Line\\n\\tindented\"\n  mapping: |-\n    One\n\n    Two\n"
+    data = _yaml_load(text)
+
+    assert data == yaml.safe_load(text)
+    assert _yaml_dump(data) == yaml.safe_dump(data, default_flow_style=False, allow_unicode=True)
+
+
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML was built without libyaml")
+@pytest.mark.parametrize(
+    ("text", "libyaml"),
+    [
+        ("a:\tb\n", True),
+        ('a: "x\\ud800"\n', False),
+    ],
+)
+def test_translate_yaml_backend_differences(text, libyaml):
+    # The parsers differ on some invalid YAML.
+    loaders = {True: yaml.CSafeLoader, False: yaml.SafeLoader}
+
+    yaml.load(text, Loader=loaders[libyaml])
+    with pytest.raises(yaml.YAMLError):
+        yaml.load(text, Loader=loaders[not libyaml])
+
+
+def test_translate_jobs(caplog):
+    caplog.set_level(logging.DEBUG)
+
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "codelists", {"Code": "Código", "Title": "Título", "Open": "Abierta"})
+        write_mo(localedir, "es", "schema", {"Release {{version}}": "Entrega {{version}}"})
+
+        for i in range(5):
+            with open(os.path.join(sourcedir, f"method{i}.csv"), "w") as f:
+                f.write("Code,Title\nopen,Open\n")
+            with open(os.path.join(sourcedir, f"schema{i}.json"), "w") as f:
+                f.write('{"title": "Release {{version}}"}')
+
+        codelistdir = os.path.join(builddir, "codelists")
+        stats = translate(
+            [
+                (sorted(glob(os.path.join(sourcedir, "*.csv"))), codelistdir, "codelists"),
+                (sorted(glob(os.path.join(sourcedir, "*.json"))), builddir, "schema"),
+            ],
+            localedir,
+            "es",
+            headers,
+            jobs=2,
+            version="1.1",
+        )
+
+        for i in range(5):
+            with open(os.path.join(codelistdir, f"method{i}.csv")) as f:
+                assert f.read() == "Código,Título\nopen,Abierta\n"
+            with open(os.path.join(builddir, f"schema{i}.json")) as f:
+                assert json.load(f) == {"title": "Entrega 1.1"}
+
+        records = list(caplog.records)
+        caplog.clear()
+        configuration = [(sorted(glob(os.path.join(sourcedir, "*.csv"))), codelistdir, "codelists")]
+        translate(configuration, localedir, "es", headers, jobs=2)
+
+        # Unchanged files are logged by the main process, in order.
+        assert [record.message for record in caplog.records if record.message.startswith("Not writing")] == [
+            f"Not writing {os.path.join(codelistdir, f'method{i}.csv')}, whose content is unchanged" for i in range(5)
+        ]
+
+    assert [record.message for record in records[:2]] == [
+        f'Translating to es using "codelists" domain, into {codelistdir}',
+        f'Translating to es using "schema" domain, into {builddir}',
+    ]
+
+    # Each file is translated by one of the worker processes, each of which has its own memo.
+    hits, misses = map(int, re.findall(r"\d+", records[2].message))
+    assert hits + misses == 30
+    assert 4 <= misses <= 8
+
+    assert (stats.hits, stats.misses) == (hits, misses)
+    assert [os.path.basename(file_stats.source) for file_stats in stats.files] == [
+        *(f"method{i}.csv" for i in range(5)),
+        *(f"schema{i}.json" for i in range(5)),
+    ]
+    assert stats.lookups == 30
+    assert stats.untranslated == 0
+    assert set(stats.catalogs) == {"codelists", "schema"}
+
+
+def test_translate_stats():
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "schema", {"Release": "Entrega"})
+
+        source = os.path.join(sourcedir, "release-schema.json")
+        with open(source, "w") as f:
+            f.write('{"title": "Release", "description": "Untranslated", "items": [{"title": "Release"}]}')
+
+        progress = []
+        stats = translate(
+            [([source], builddir, "schema")], localedir, "es", headers, incremental=True, progress=progress.append
+        )
+
+        path = os.path.join(builddir, "release-schema.json")
+
+        assert stats.language == "es"
+        assert stats.files == progress
+        assert list(stats.catalogs) == ["schema"]
+        assert stats.seconds >= stats.files[0].seconds > 0
+        assert (stats.hits, stats.misses) == (1, 2)
+
+        file_stats = stats.files[0]
+        assert file_stats.source == source
+        assert file_stats.path == path
+        assert file_stats.domain == "schema"
+        assert file_stats.method == "translate_schema"
+        assert not file_stats.skipped
+        assert file_stats.bytes_read == os.path.getsize(source)
+        assert file_stats.bytes_written == os.path.getsize(path)
+        assert (file_stats.lookups, file_stats.translated, file_stats.untranslated) == (3, 2, 1)
+        assert (stats.bytes_read, stats.bytes_written) == (file_stats.bytes_read, file_stats.bytes_written)
+        assert (stats.lookups, stats.translated, stats.untranslated) == (3, 2, 1)
+
+        stats = translate([([source], builddir, "schema")], localedir, "es", headers, incremental=True)
+
+        assert stats.files[0].skipped
+        assert stats.files[0].method == "translate_schema"
+        assert stats.lookups == 0
+
+
+def test_translate_stream():
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "schema", {"Release": "Entrega", "Name": "Nombre"})
+
+        schema = os.path.join(sourcedir, "release-schema.json")
+        with open(schema, "w") as f:
+            f.write('{"title": "Release", "minimum": 1.5, "enum": [null]}')
+        extension = os.path.join(sourcedir, "extension.json")
+        with open(extension, "w") as f:
+            f.write('{"name": "Name"}')
+
+        stats = translate([([schema, extension], builddir, "schema")], localedir, "es", headers)
+        expected = []
+        for path in (schema, extension):
+            with open(os.path.join(builddir, os.path.basename(path))) as f:
+                expected.append(f.read())
+
+        stats = translate([([schema, extension], builddir, "schema")], localedir, "es", headers, stream=True)
+
+        assert [file_stats.method for file_stats in stats.files] == [
+            "translate_schema_stream",
+            "translate_extension_metadata_stream",
+        ]
+        assert not any(file_stats.written for file_stats in stats.files)
+        assert json.loads(expected[0]) == {"title": "Entrega", "minimum": 1.5, "enum": [None]}
+
+
+def test_translate_unchanged():
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "codelists", {"Code": "Código", "Open": "Abierta"})
+
+        source = os.path.join(sourcedir, "method.csv")
+        with open(source, "w") as f:
+            f.write("Code\nOpen\n")
+
+        path = os.path.join(builddir, "method.csv")
+
+        stats = translate([([source], builddir, "codelists")], localedir, "es", headers)
+
+        assert stats.files[0].written
+        os.utime(path, (0, 0))
+
+        # Unchanged files aren't written.
+        stats = translate([([source], builddir, "codelists")], localedir, "es", headers)
+
+        assert not stats.files[0].written
+        assert os.path.getmtime(path) == 0
+        assert os.listdir(builddir) == ["method.csv"]
+
+        with open(source, "w") as f:
+            f.write("Code\nClosed\n")
+
+        stats = translate([([source], builddir, "codelists")], localedir, "es", headers)
+
+        assert stats.files[0].written
+        assert os.path.getmtime(path) > 0
+        assert os.listdir(builddir) == ["method.csv"]
+        with open(path) as f:
+            assert f.read() == "Código\nClosed\n"
+
+
+def test_write_if_changed():
+    with TemporaryDirectory() as builddir:
+        path = os.path.join(builddir, "file.txt")
+
+        assert _write_if_changed(path, lambda w: w.write("a"))
+        os.utime(path, (0, 0))
+
+        assert not _write_if_changed(path, lambda w: w.write("a"))
+        # Content of the same size is compared, whatever the modification time.
+        assert _write_if_changed(path, lambda w: w.write("b"))
+        os.utime(path, (0, 0))
+        assert _write_if_changed(path, lambda w: w.write("a"))
+
+        with open(path) as f:
+            assert f.read() == "a"
+        assert os.listdir(builddir) == ["file.txt"]
+        if os.name == "posix":
+            assert os.stat(path).st_mode & 0o777 == 0o666 & ~UMASK
+
+
+def test_translate_languages(caplog):
+    caplog.set_level(logging.INFO)
+
+    files = {
+        "method.csv": "Code,Title\nopen,Open\n",
+        "release-schema.json": '{"title": "Release {{version}} [{{lang}}]", "items": [{"description": "Open"}]}',
+        "extension.json": '{"name": "Open", "description": "Release {{version}} [{{lang}}]"}',
+        "README.md": "# Open\n\nRelease {{version}} [{{lang}}]\n",
+        "mapping.yaml": "- title: Open\n  mapping: Release {{version}} [{{lang}}]\n",
+    }
+    messages = {
+        "es": {"Code": "Código", "Title": "Título", "Open": "Abierta", "Release {{version}} [{{lang}}]": "Entrega"},
+        "fr": {"Code": "Code", "Title": "Titre", "Open": "Ouverte", "Release {{version}} [{{lang}}]": "Version"},
+    }
+
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        for language, catalog in messages.items():
+            write_mo(localedir, language, "docs", catalog)
+
+        for filename, content in files.items():
+            with open(os.path.join(sourcedir, filename), "w") as f:
+                f.write(content)
+
+        sources = sorted(glob(os.path.join(sourcedir, "*")))
+        stats = translate_languages(
+            [(sources, lambda language: os.path.join(builddir, "multiple", language), "docs")],
+            localedir,
+            ["es", "fr"],
+            headers,
+            keys=["title", "mapping"],
+            version="1.1",
+        )
+
+        assert [record.message for record in caplog.records] == [
+            f'Translating to {language} using "docs" domain, into {os.path.join(builddir, "multiple", language)}'
+            for language in ("es", "fr")
+        ]
+
+        for language in ("es", "fr"):
+            single = translate(
+                [(sources, os.path.join(builddir, "single", language), "docs")],
+                localedir,
+                language,
+                headers,
+                keys=["title", "mapping"],
+                version="1.1",
+            )
+
+            for filename in files:
+                with open(os.path.join(builddir, "multiple", language, filename)) as f:
+                    actual = f.read()
+                with open(os.path.join(builddir, "single", language, filename)) as f:
+                    expected = f.read()
+
+                assert actual == expected
+                assert "Open" not in actual
+
+            # The statistics match those of `translate`, other than times.
+            assert stats[language].language == language
+            assert list(stats[language].catalogs) == ["docs"]
+            assert [(f.method, f.written, f.bytes_written, f.lookups) for f in stats[language].files] == [
+                (f.method, True, f.bytes_written, f.lookups) for f in single.files
+            ]
+            assert (stats[language].hits, stats[language].misses) == (single.hits, single.misses)
+
+
+def test_translate_incremental(caplog):
+    caplog.set_level(logging.INFO)
+
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "schema", {"Release": "Entrega", "Record": "Registro"})
+
+        sources = [os.path.join(sourcedir, "release-schema.json"), os.path.join(sourcedir, "record-schema.json")]
+        with open(sources[0], "w") as f:
+            f.write('{"title": "Release"}')
+        with open(sources[1], "w") as f:
+            f.write('{"title": "Record"}')
+
+        def run(**kwargs):
+            caplog.clear()
+            translate([(sources, builddir, "schema")], localedir, "es", headers, incremental=True, **kwargs)
+            return [record.message for record in caplog.records[1:]]
+
+        assert run() == []
+        assert run() == [f"Skipping {sources[0]}, which is unchanged", f"Skipping {sources[1]}, which is unchanged"]
+
+        # Source changed.
+        with open(sources[0], "w") as f:
+            f.write('{"title": "Record"}')
+        assert run() == [f"Skipping {sources[1]}, which is unchanged"]
+
+        with open(os.path.join(builddir, "release-schema.json")) as f:
+            assert json.load(f) == {"title": "Registro"}
+
+        # Output removed.
+        os.remove(os.path.join(builddir, "record-schema.json"))
+        assert run() == [f"Skipping {sources[0]}, which is unchanged"]
+
+        # Arguments changed.
+        assert run(version="1.1") == []
+
+        # Catalog changed.
+        write_mo(localedir, "es", "schema", {"Release": "Entrega", "Record": "Expediente"})
+        gettext._translations.clear()  # noqa: SLF001 # like a new process
+        assert run(version="1.1") == []
+
+        with open(os.path.join(builddir, "release-schema.json")) as f:
+            assert json.load(f) == {"title": "Expediente"}
+
+        # Output written by a call without `incremental`.
+        write_mo(localedir, "es", "other", {"Record": "Otro"})
+        translate([(sources[:1], builddir, "other")], localedir, "es", headers, version="1.1")
+        assert run(version="1.1") == [f"Skipping {sources[1]}, which is unchanged"]
+
+        with open(os.path.join(builddir, "release-schema.json")) as f:
+            assert json.load(f) == {"title": "Expediente"}
+
+        # Output modified.
+        with open(os.path.join(builddir, "record-schema.json"), "w") as f:
+            f.write("{}")
+        assert run(version="1.1") == [f"Skipping {sources[0]}, which is unchanged"]
+
+
+def test_translate_schema_plan():
+    class Translation:
+        def gettext(self, message):
+            return {"Release {{version}}": "Entrega {{version}}", "Tags": "Etiquetas"}.get(message, message)
+
+    schema = {
+        "title": "  Release {{version}}  ",
+        "description": "    ",
+        "properties": {
+            "tag": {"title": "Tags", "items": [{"title": "Tags"}, {"enum": ["title"]}]},
+            "title": {"type": "string", "description": "Release {{version}}"},
+            "0": {"description": "Tags"},
+        },
+    }
+
+    plan = compile_schema_plan(schema)
+
+    assert plan == [
+        ["title"],
+        ["properties", "tag", "title"],
+        ["properties", "tag", "items", 0, "title"],
+        ["properties", "title", "description"],
+        ["properties", "0", "description"],
+    ]
+
+    plan = json.loads(json.dumps(plan))
+
+    data = translate_schema_plan(schema, plan, Translation(), version="1.1")
+
+    assert data == translate_schema_data(schema, Translation(), version="1.1")
+    assert data["title"] == "Entrega 1.1"
+    assert schema["title"] == "  Release {{version}}  "
+
+
+def test_translate_schema_data_inplace():
+    class Translation:
+        def gettext(self, message):
+            return {"Release": "Entrega"}[message]
+
+    schema = {"properties": {"tag": {"title": "Release"}}}
+
+    data = translate_schema_data(schema, Translation(), inplace=True)
+
+    assert data is schema
+    assert schema == {"properties": {"tag": {"title": "Entrega"}}}
+
+
+def test_translate_schema_plan_shares_untranslated():
+    class Translation:
+        def gettext(self, message):
+            return {"Release": "Entrega"}[message]
+
+    schema = {"properties": {"tag": {"title": "Release"}, "id": {"type": "string"}}, "required": ["id"]}
+
+    data = translate_schema_plan(schema, compile_schema_plan(schema), Translation())
+
+    assert data == {"properties": {"tag": {"title": "Entrega"}, "id": {"type": "string"}}, "required": ["id"]}
+    assert schema["properties"]["tag"]["title"] == "Release"
+    assert data["properties"]["id"] is schema["properties"]["id"]
+    assert data["required"] is schema["required"]
+
+
+def test_translate_codelist_stream():
+    class Translation:
+        def gettext(self, message):
+            return {"Code": "Código", "Title": "Título", "Open": "Abierta"}[message]
+
+    codelist = "Code,Title\nopen,Open\nopen,Open\n"
+
+    output = StringIO()
+    translate_codelist_stream(StringIO(codelist), output, Translation(), ["Title"])
+
+    assert output.getvalue() == translate_codelist(StringIO(codelist), Translation(), ["Title"])
+    assert output.getvalue() == "Código,Título\nopen,Abierta\nopen,Abierta\n"
+
+
+def test_translate_schema_stream():
+    class Translation:
+        def gettext(self, message):
+            return {"Release": "Entrega «{{lang}}»"}.get(message, message)
+
+    schema = '{"title": "Release", "properties": {"id": {"description": "Release", "minimum": 1.5, "enum": [null]}}}'
+
+    output = StringIO()
+    translate_schema_stream(StringIO(schema), output, Translation(), lang="es")
+
+    assert output.getvalue() == translate_schema(StringIO(schema), Translation(), lang="es")
+    assert json.loads(output.getvalue())["title"] == "Entrega «es»"
+
+
+def test_translate_codelist_data_iter():
+    class Translation:
+        def gettext(self, message):
+            return {"Code": "Código", "Title": "Título", "Open": "Abierta"}[message]
+
+    consumed = []
+
+    def source():
+        for code in ("open", "selective"):
+            consumed.append(code)
+            yield {"Code": code, "Title": "Open"}
+
+    rows = translate_codelist_data_iter(source(), Translation(), ["Title"])
+
+    assert consumed == []
+    assert next(rows) == {"Código": "open", "Título": "Abierta"}
+    assert consumed == ["open"]
+
+
+def test_translate_schema_data_deep():
+    class Translation:
+        def gettext(self, message):
+            return {"Release": "Entrega"}[message]
+
+    schema = leaf = {}
+    for _ in range(sys.getrecursionlimit() * 2):
+        leaf["items"] = [{}]
+        leaf = leaf["items"][0]
+    leaf["title"] = "Release"
+
+    translate_schema_data(schema, Translation(), inplace=True)
+
+    assert leaf == {"title": "Entrega"}
+    assert len(compile_schema_plan(schema)[0]) == sys.getrecursionlimit() * 4 + 1
+
+
+def test_translate_markdown_data_inline():
+    class Translation:
+        def gettext(self, message):
+            return {"Text": "# Pas un titre", "Item": "  Élément  ", "List": "1. Pas une liste"}[message]
+
+    assert translate_markdown_data("README.md", "Text\n\n- Item\n\nList\n", Translation()) == (
+        "\\# Pas un titre\n\n- Élément\n\n1\\. Pas une liste\n"
+    )
+
+
+def test_translate_markdown_data_threads():
+    class Translation:
+        def gettext(self, message):
+            return message.upper()
+
+    documents = [f"# Heading {i}\n\nParagraph with **bold {i % 3}** and `code`.\n\n- Item {i}\n" for i in range(20)]
+    expected = [translate_markdown_data("README.md", document, Translation()) for document in documents]
+
+    with ThreadPoolExecutor(4) as executor:
+        actual = list(
+            executor.map(lambda document: translate_markdown_data("README.md", document, Translation()), documents)
+        )
+
+    assert actual == expected
+    assert expected[1] == "# HEADING 1\n\nPARAGRAPH WITH **BOLD 1** AND `CODE`.\n\n- ITEM 1\n"
+
+
+def test_translate_markdown_data_block_cache(monkeypatch):
+    class Translation:
+        def gettext(self, message):
+            return message.upper()
+
+    rendered = []
+    render = RenderTreeNode.render
+
+    def spy(self, context):
+        if self.parent and self.parent.type == "root":
+            rendered.append(self.type)
+        return render(self, context)
+
+    monkeypatch.setattr(RenderTreeNode, "render", spy)
+
+    before = "# Block cache\n\nFirst paragraph.\n\n- Item\n\n* Item\n\nLast paragraph.\n"
+    after = "# Block cache\n\nChanged paragraph.\n\n- Item\n\n* Item\n\nLast paragraph.\n"
+
+    assert translate_markdown_data("README.md", before, Translation()) == (
+        "# BLOCK CACHE\n\nFIRST PARAGRAPH.\n\n- ITEM\n\n* ITEM\n\nLAST PARAGRAPH.\n"
+    )
+    assert rendered == ["heading", "paragraph", "bullet_list", "bullet_list", "paragraph"]
+
+    rendered.clear()
+
+    assert translate_markdown_data("README.md", after, Translation()) == (
+        "# BLOCK CACHE\n\nCHANGED PARAGRAPH.\n\n- ITEM\n\n* ITEM\n\nLAST PARAGRAPH.\n"
+    )
+    assert rendered == ["paragraph"]
+
+
+def test_translate_markdown_data_references():
+    class Translation:
+        def gettext(self, message):
+            return message.upper()
+
+    md = "# See [the link][ref]\n\n- [Another link][ref]\n\n[ref]: http://example.com\n"
+
+    parser = MarkdownIt()
+    env = {}
+    tokens = parser.parse(md, env)
+    for token in tokens:
+        if token.type == "inline":
+            token.children = parser.parseInline(token.content.upper())[0].children
+
+    assert translate_markdown_data("README.md", md, Translation()) == MDRenderer().render(tokens, parser.options, env)
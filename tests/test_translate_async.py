@@ -0,0 +1,159 @@
+import asyncio
+import gettext
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from ocds_babel import translate_async
+from ocds_babel.translate import translate_schema_data
+from tests import write_mo
+
+headers = ["Title", "Description", "Extension"]
+
+
+# Unlike gettext.GNUTranslations, this is picklable.
+class DictTranslations(gettext.NullTranslations):
+    def __init__(self, catalog):
+        super().__init__()
+        self.catalog = catalog
+
+    def gettext(self, message):
+        return self.catalog.get(message, message)
+
+
+def test_translate():
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "codelists", {"Code": "Código", "Title": "Título", "Open": "Abierta"})
+        write_mo(localedir, "es", "schema", {"Release {{version}}": "Entrega {{version}}"})
+
+        for i in range(5):
+            with open(os.path.join(sourcedir, f"method{i}.csv"), "w") as f:
+                f.write("Code,Title\nopen,Open\n")
+            with open(os.path.join(sourcedir, f"schema{i}.json"), "w") as f:
+                f.write('{"title": "Release {{version}}"}')
+
+        codelistdir = os.path.join(builddir, "codelists")
+        progress = []
+        stats = asyncio.run(
+            translate_async.translate(
+                [
+                    (sorted(glob(os.path.join(sourcedir, "*.csv"))), codelistdir, "codelists"),
+                    (sorted(glob(os.path.join(sourcedir, "*.json"))), builddir, "schema"),
+                ],
+                localedir,
+                "es",
+                headers,
+                progress=progress.append,
+                limiter=asyncio.Semaphore(2),
+                version="1.1",
+            )
+        )
+
+        for i in range(5):
+            with open(os.path.join(codelistdir, f"method{i}.csv")) as f:
+                assert f.read() == "Código,Título\nopen,Abierta\n"
+            with open(os.path.join(builddir, f"schema{i}.json")) as f:
+                assert json.load(f) == {"title": "Entrega 1.1"}
+
+    assert stats.files == progress
+    assert [os.path.basename(file_stats.source) for file_stats in stats.files] == [
+        *(f"method{i}.csv" for i in range(5)),
+        *(f"schema{i}.json" for i in range(5)),
+    ]
+    assert stats.lookups == 30
+    assert set(stats.catalogs) == {"codelists", "schema"}
+
+
+def test_translate_cancel():
+    with TemporaryDirectory() as localedir, TemporaryDirectory() as sourcedir, TemporaryDirectory() as builddir:
+        write_mo(localedir, "es", "schema", {})
+
+        source = os.path.join(sourcedir, "release-schema.json")
+        with open(source, "w") as f:
+            f.write("{}")
+
+        async def main():
+            limiter = asyncio.Semaphore(1)
+            async with limiter:
+                task = asyncio.create_task(
+                    translate_async.translate(
+                        [([source], builddir, "schema")], localedir, "es", headers, limiter=limiter
+                    )
+                )
+                # Let the task wait for the limiter.
+                while not limiter._waiters:  # noqa: ASYNC110, SLF001
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(main())
+
+        assert os.listdir(builddir) == []
+
+
+def test_translate_schema_data():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", {"Release": "Entrega"})
+        translator = gettext.translation("schema", localedir, languages=["es"])
+
+        data = {"title": "Release", "properties": {"a": {"description": "Release"}}}
+
+        expected = translate_schema_data(data, translator, lang="es")
+
+        assert asyncio.run(translate_async.translate_schema_data(data, translator, lang="es")) == expected
+
+        # Any keyword argument can be a marker.
+        assert asyncio.run(translate_async.translate_schema_data({"title": "{{stream}}"}, translator, stream="x")) == {
+            "title": "x"
+        }
+
+    # Arguments and results are pickled to and from worker processes.
+    async def main():
+        with ProcessPoolExecutor(1) as executor:
+            return await translate_async.translate_schema_data(
+                data, DictTranslations({"Release": "Entrega"}), executor=executor, lang="es"
+            )
+
+    assert asyncio.run(main()) == expected
+
+
+def test_translate_markdown_data():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "docs", {"Open": "Abierta"})
+        translator = gettext.translation("docs", localedir, languages=["es"])
+
+        assert (
+            asyncio.run(translate_async.translate_markdown_data("README.md", "# Open\n", translator)) == "# Abierta\n"
+        )
+
+
+def test_limiter():
+    running = 0
+    maximum = 0
+
+    def translator_gettext(message):
+        nonlocal running, maximum
+        running += 1
+        maximum = max(maximum, running)
+        # Give the other threads a chance to run.
+        time.sleep(0.01)
+        running -= 1
+        return message
+
+    translator = gettext.NullTranslations()
+    translator.gettext = translator_gettext
+
+    async def main():
+        limiter = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            *(translate_async.translate_schema_data({"title": str(i)}, translator, limiter=limiter) for i in range(6))
+        )
+
+    assert asyncio.run(main()) == [{"title": str(i)} for i in range(6)]
+    assert 1 <= maximum <= 2
@@ -0,0 +1,226 @@
+import gettext
+import platform
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from ocds_babel.translate import translate_codelist_data, translate_schema_data
+from ocds_babel.translations import MappedTranslations, MultilingualCatalog, TranslationMemo
+from tests import write_mo
+
+messages = {
+    "Code": "Código",
+    "Title": "Título",
+    "Open": "Abierta",
+    "Release {{version}}": "Entrega {{version}}",
+    "Ünïcödé": "Unicode",
+    "context\x04Open": "Abierto",
+}
+
+
+def test_mapped_translations():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", messages)
+
+        expected = gettext.translation("schema", localedir, languages=["es"])
+        translator = gettext.translation("schema", localedir, languages=["es"], class_=MappedTranslations)
+
+        assert isinstance(translator, MappedTranslations)
+        assert translator.info() == expected.info()
+        assert translator.charset() == expected.charset() == "utf-8"
+
+        for message in (*messages, "", "Closed", "Cod", "Codes", "€"):
+            assert translator.gettext(message) == expected.gettext(message)
+
+        assert translator.pgettext("context", "Open") == "Abierto"
+        assert translator.pgettext("context", "Closed") == "Closed"
+
+        # Unmap the MO file, so that it can be deleted on Windows.
+        translator.close()
+
+
+def test_mapped_translations_babel_contexts():
+    # Babel sorts messages by ID, then by context, so the table of messages isn't sorted by key.
+    messages = {message: message.upper() for message in ("apple", "banana", "cherry", "date", "elderberry", "fig")}
+    messages.update({f"zz\x04{message}": message.upper() * 2 for message in ("a", "b", "c", "d")})
+
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", messages)
+
+        expected = gettext.translation("schema", localedir, languages=["es"])
+        translator = gettext.translation("schema", localedir, languages=["es"], class_=MappedTranslations)
+
+        assert translator._index is not None  # noqa: SLF001
+        assert translator.info() == expected.info()
+
+        for message in ("apple", "banana", "fig", "a", "z", ""):
+            assert translator.gettext(message) == expected.gettext(message)
+        for message in ("a", "b", "d", "apple", "z"):
+            assert translator.pgettext("zz", message) == expected.pgettext("zz", message)
+        assert translator.pgettext("z", "a") == "a"
+
+        translator.close()
+
+
+def test_mapped_translations_translator():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", messages)
+
+        translator = gettext.translation("schema", localedir, languages=["es"], class_=MappedTranslations)
+
+        assert translate_schema_data({"title": "Release {{version}}"}, translator, version="1.1") == {
+            "title": "Entrega 1.1"
+        }
+        assert translate_codelist_data([{"Code": "open", "Title": "Open"}], translator, ["Title"]) == [
+            {"Código": "open", "Título": "Abierta"}
+        ]
+
+        translator.close()
+
+
+def test_mapped_translations_fallback():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", {"Open": "Abierta"})
+        write_mo(localedir, "fr", "schema", {"Open": "Ouverte", "Closed": "Fermée"})
+
+        translator = gettext.translation("schema", localedir, languages=["es", "fr"], class_=MappedTranslations)
+
+        assert translator.gettext("Open") == "Abierta"
+        assert translator.gettext("Closed") == "Fermée"
+        assert translator.gettext("Pending") == "Pending"
+
+        # Fallback catalogs are unmapped, too.
+        translator.close()
+
+        with pytest.raises(ValueError, match="closed"):
+            translator._fallback.gettext("Closed")  # noqa: SLF001
+
+
+def test_mapped_translations_empty():
+    translator = MappedTranslations()
+
+    assert translator.gettext("Open") == "Open"
+
+    translator.close()
+
+
+def test_mapped_translations_bad_magic_number():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", {})
+        with open(f"{localedir}/es/LC_MESSAGES/schema.mo", "r+b") as f:
+            f.write(b"\0\0\0\0")
+
+        with pytest.raises(OSError, match="Bad magic number"):
+            gettext.translation("schema", localedir, languages=["es"], class_=MappedTranslations)
+
+
+def test_multilingual_catalog():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", messages)
+        write_mo(localedir, "fr", "schema", {"Code": "Code", "Open": "Ouverte", "Closed": "Fermée"})
+
+        catalog = MultilingualCatalog("schema", localedir, ["es", "fr"])
+        expected = {
+            language: gettext.translation("schema", localedir, languages=[language])
+            for language in catalog.translations
+        }
+
+    for language, translations in expected.items():
+        translator = catalog.translator(language)
+
+        for message in (*messages, "", "Closed", "Cod", "Codes", "€"):
+            assert translator.gettext(message) == translations.gettext(message)
+
+    assert catalog.translator("es").pgettext("context", "Open") == "Abierto"
+    assert catalog.translator("fr").pgettext("context", "Open") == "Open"
+
+    # Message IDs are stored once, and re-used for messages that aren't translated.
+    assert len(catalog.index) == 8
+    assert catalog.translations["fr"][catalog.index["Code"]] is catalog.msgids[catalog.index["Code"]]
+
+    assert translate_schema_data({"title": "Open"}, catalog.translator("fr")) == {"title": "Ouverte"}
+
+
+def test_multilingual_catalog_fallbacks():
+    with TemporaryDirectory() as localedir:
+        write_mo(localedir, "es", "schema", {"Open": "Abierta", "Closed": "Cerrada"})
+        write_mo(localedir, "es_MX", "schema", {"Open": "Abierto"})
+
+        catalog = MultilingualCatalog("schema", localedir, ["es_MX"], fallbacks={"es_MX": ["es"]})
+
+    assert list(catalog.translations) == ["es_MX", "es"]
+    assert catalog.translator("es_MX").gettext("Open") == "Abierto"
+    assert catalog.translator("es_MX").gettext("Closed") == "Cerrada"
+    assert catalog.translator("es_MX").gettext("Pending") == "Pending"
+    assert catalog.translator("es").gettext("Open") == "Abierta"
+
+
+def test_multilingual_catalog_missing():
+    with TemporaryDirectory() as localedir, pytest.raises(FileNotFoundError):
+        MultilingualCatalog("schema", localedir, ["es"])
+
+
+@pytest.mark.skipif(platform.python_implementation() != "CPython", reason="tracemalloc requires CPython")
+def test_multilingual_catalog_memory():
+    import tracemalloc  # noqa: PLC0415
+
+    languages = ["de", "es", "fr", "it", "pt", "ru"]
+    source = {f"Message {i}, which is a sentence of a typical length": f"Translation {i}" for i in range(1000)}
+
+    with TemporaryDirectory() as localedir:
+        for language in languages:
+            write_mo(localedir, language, "schema", {key: f"[{language}] {value}" for key, value in source.items()})
+
+        # `gettext.translation` caches catalogs by path.
+        gettext._translations.clear()  # noqa: SLF001
+        tracemalloc.start()
+        try:
+            translators = [gettext.translation("schema", localedir, languages=[language]) for language in languages]
+            separate = tracemalloc.get_traced_memory()[0]
+            del translators
+            gettext._translations.clear()  # noqa: SLF001
+            tracemalloc.clear_traces()
+
+            catalog = MultilingualCatalog("schema", localedir, languages)
+            combined = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    assert (
+        catalog.translator("ru").gettext("Message 1, which is a sentence of a typical length") == "[ru] Translation 1"
+    )
+    # The combined catalog uses about half the memory (52% on CPython 3.11). Allow a margin for other versions.
+    assert combined < separate * 0.75
+
+
+def test_translation_memo():
+    class Translation:
+        def __init__(self):
+            self.calls = 0
+
+        def gettext(self, message):
+            self.calls += 1
+            return {"Release {{version}} [{{lang}}]": "Entrega {{version}} [{{lang}}]"}.get(message, message)
+
+    schema = {"title": "Release {{version}} [{{lang}}]", "items": [{"title": "Release {{version}} [{{lang}}]"}]}
+
+    translation = Translation()
+    memo = TranslationMemo()
+    translator = memo.bind(translation, "schema", "es", version="1.1", lang="es")
+
+    for _ in range(3):
+        assert translate_schema_data(schema, translator) == {
+            "title": "Entrega 1.1 [es]",
+            "items": [{"title": "Entrega 1.1 [es]"}],
+        }
+
+    assert translation.calls == 1
+    assert memo.hits == 5
+    assert memo.misses == 1
+
+    # Different replacements are cached separately.
+    translator = memo.bind(translation, "schema", "es", version="1.2", lang="es")
+
+    assert translator.gettext("Release {{version}} [{{lang}}]") == "Entrega 1.2 [es]"
+    assert translator.gettext("{{lang}}{{version}}") == "es1.2"
+    assert memo.misses == 3
@@ -0,0 +1,73 @@
+import json
+from io import StringIO
+
+import pytest
+
+from ocds_babel import util
+from ocds_babel.util import json_backend, json_dump, json_dumps, json_loads
+
+DATA = [
+    {"title": "Titre", "description": "Ligne\n\t« é »\u2028\x7f", "empty": {}, "items": []},
+    [1, -1, 0.5, 1e15, 1e16, -1.5e20, 1e-4, 1e-5, 5e-324, -0.0, 2**64, -(2**63) - 1],
+    [None, True, False, float("nan"), float("inf"), float("-inf")],
+    {"1e5": "1e5", "value": "a: 1e5", "null": "null"},
+    {1: "one"},
+    "\ud800",
+]
+
+
+@pytest.mark.parametrize("data", DATA)
+@pytest.mark.parametrize("backend", [True, False])
+def test_json_dumps(monkeypatch, data, backend):
+    if not backend:
+        monkeypatch.setattr(util, "orjson", None)
+
+    assert json_dumps(data) == json.dumps(data, ensure_ascii=False, indent=2)
+
+
+@pytest.mark.skipif(util.orjson is None, reason="orjson is not installed")
+def test_json_dumps_null(monkeypatch):
+    data = {"enum": [None, "open"], "default": None}
+    expected = json.dumps(data, ensure_ascii=False, indent=2)
+
+    # orjson is used for data with null values, if it has no NaN or Infinity.
+    monkeypatch.setattr(json, "dumps", None)
+
+    assert json_dumps(data) == expected
+    assert json_dumps(None) == "null"
+
+
+@pytest.mark.parametrize("data", DATA)
+@pytest.mark.parametrize("chunk_size", [1, 10, 65536])
+def test_json_dump(monkeypatch, data, chunk_size):
+    monkeypatch.setattr(util, "JSON_CHUNK_SIZE", chunk_size)
+
+    io = StringIO()
+    json_dump(data, io)
+
+    assert io.getvalue() == json.dumps(data, ensure_ascii=False, indent=2)
+
+
+@pytest.mark.parametrize("data", DATA[:4])
+@pytest.mark.parametrize("backend", [True, False])
+def test_json_loads(monkeypatch, data, backend):
+    if not backend:
+        monkeypatch.setattr(util, "orjson", None)
+
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+
+    assert repr(json_loads(text)) == repr(json.loads(text))
+    assert repr(json_loads(text.encode())) == repr(json.loads(text))
+
+
+def test_json_loads_invalid():
+    with pytest.raises(json.JSONDecodeError):
+        json_loads("{")
+
+
+def test_json_backend(monkeypatch):
+    assert json_backend() == ("json" if util.orjson is None else "orjson")
+
+    monkeypatch.setattr(util, "orjson", None)
+
+    assert json_backend() == "json"